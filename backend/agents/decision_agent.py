@@ -1,4 +1,6 @@
-from langchain_openai import ChatOpenAI
+from backend.factory.client_registry import get_llm
+from backend.utils.budget import budget_exceeded, can_retry, finish_with_best, record_usage
+from backend.utils.metrics import time_agent_node
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
@@ -7,11 +9,16 @@ class ValidationResult(BaseModel):
     """pydantic model for structured output"""
     is_valid: bool = Field(description="Indicates if the candidate answer is valid")
     reason: str = Field(default="", description="Feedback on the candidate answer")
+    score: float = Field(default=0.0, description="Confidence from 0 to 1 that the candidate answer is correct and complete")
+@time_agent_node
 def validator_agent(state):
 
     """ validation of the results thrown in llm, rag or web"""
 
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)
+    if budget_exceeded(state):
+        return finish_with_best(state)
+
+    llm = get_llm(model_name="gpt-4o", temperature=0)
     parser = JsonOutputParser(pydantic_object=ValidationResult)
 
     validation_prompt_template = PromptTemplate(
@@ -34,7 +41,9 @@ def validator_agent(state):
         format_instructions=parser.get_format_instructions()
     )
 
-    llm_response = llm.invoke(prompt).content
+    response = llm.invoke(prompt)
+    record_usage(state, response)
+    llm_response = response.content
     print("\n--- VALIDATOR AGENT ---")
     print(f"RAW LLM RESPONSE:\n{llm_response}")
     print("-----------------------\n")
@@ -44,12 +53,24 @@ def validator_agent(state):
         state.is_valid = parsed_result['is_valid']
         state.feedback = parsed_result['reason']
 
+        score = float(parsed_result.get('score', 0.0))
+
         if parsed_result['is_valid']:
             state.final_answer = state.candidate_answer
     except Exception as e:
         print(f"ERROR: Failed to parse validator response. Error: {e}")
         state.is_valid = False
         state.feedback = "The validator's response was malformed and could not be parsed."
+        score = 0.0
+
+    # Remember the best candidate in case the budget runs out before one is valid
+    if state.candidate_answer is not None and score > state.best_score:
+        state.best_answer = state.candidate_answer
+        state.best_score = score
+        state.best_answer_source = state.answer_source
+        state.best_sources = state.sources
 
+    if state.is_valid is False and not can_retry(state):
+        return finish_with_best(state)
     return state 
     
\ No newline at end of file
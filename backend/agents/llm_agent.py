@@ -1,11 +1,15 @@
-from langchain_openai import ChatOpenAI
+from backend.factory.client_registry import get_llm
+from backend.utils.budget import record_usage, within_budget
+from backend.utils.metrics import time_agent_node
 from langchain.prompts import PromptTemplate
 
 
+@time_agent_node
+@within_budget
 def llm_agent(state):
     """LLM agent for general knowledge chat"""
 
-    llm = ChatOpenAI(model_name="gpt-4o", temperature=0)
+    llm = get_llm(model_name="gpt-4o", temperature=0)
     prompt_template = PromptTemplate(
         input_variables=["query", "context"],
         template=(
@@ -17,7 +21,9 @@ def llm_agent(state):
     )
     context_str = "\n\n".join(state.context + state.web_data)
     prompt = prompt_template.format(context=context_str, query=state.query)
-    result = llm.invoke(prompt).content
+    response = llm.invoke(prompt)
+    record_usage(state, response)
+    result = response.content
 
     # Store the LLM’s response
     state.candidate_answer = result
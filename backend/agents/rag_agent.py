@@ -1,12 +1,16 @@
-import os
-from langchain_openai import OpenAIEmbeddings
-from langchain_milvus import Milvus
-from langchain_community.vectorstores import Chroma
+import json
+from backend.factory.client_registry import get_vector_store
 from backend.factory.retriever_factory import get_retriever
-from backend.utils.metrics import time_agent_node
+from backend.utils.metrics import RETRIEVER_ERRORS, RETRIEVER_LATENCY, time_agent_node, track
+from backend.utils.budget import within_budget
+from backend.utils.singleflight import SingleFlight, normalize
+from backend.utils.tracing import annotate, span
+
+retrieval_flight = SingleFlight("rag_retrieval")
 
 
 @time_agent_node
+@within_budget
 def rag_agent(state):
     """ RAG agent which will retrieve relevant docsfrom cloud or memory db based
     on user input"""
@@ -15,43 +19,21 @@ def rag_agent(state):
     query = state.query
     k= config.get("k", 5)
 
-    vectordb = config.get("vectordb", "milvus").lower()
-
-    
-
-    embeddings = OpenAIEmbeddings(model ="text-embedding-3-small",client=None)
-
-    vector_store = None
-    if vectordb == "milvus":
-        milvus_url = os.environ.get("MILVUS_URL")
-        milvus_token = os.environ.get("MILVUS_TOKEN")
-        collection_name = config.get("collection_name", "documents")
-
-        vector_store = Milvus(
-            embedding_function=embeddings,
-            collection_name=collection_name,
-            connection_args={"uri": milvus_url, "token": milvus_token},
-            text_field="text",  # Name of document attributes to holding text
-            vector_field="embedding"  # name of doc attribute to hold vector
-        )
-    elif vectordb == "chroma":
-        persist_directory = config.get("persist_directory", "chroma_db")
-        collection_name = config.get("collection_name", "documents")
-        vector_store = Chroma(
-            embedding_function=embeddings,
-            collection_name=collection_name,
-            persist_directory=persist_directory
-        )
-        
-    else:
+    try:
+        vector_store = get_vector_store(config)
+    except ValueError as e:
         state.context = []
         state.sources = []
-        state.error = f"Invalid vectordb '{vectordb}'. Valid options: ['milvus', 'chroma']"
+        state.error = str(e)
         return state
     
     retriever = get_retriever(vector_store, config)
 
-    doc_and_stores = retriever.get_relevant_documents(query)
+    retriever_type = config.get("retriever_type", "vectorstore")
+    with track(RETRIEVER_LATENCY, retriever_type, errors=RETRIEVER_ERRORS), span("retrieve", retriever=retriever_type):
+        key = (json.dumps(config, sort_keys=True, default=str), normalize(query))
+        doc_and_stores = retrieval_flight.do(key, retriever.get_relevant_documents, query)
+        annotate(chunks=len(doc_and_stores))
 
     state.context = [doc.page_content for doc in doc_and_stores]
     #state.scores = [float(score) for _, score in doc_and_stores]
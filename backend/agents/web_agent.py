@@ -1,6 +1,10 @@
 import os
 from tavily import TavilyClient
+from backend.utils.budget import within_budget
+from backend.utils.metrics import time_agent_node, track_outbound
 
+@time_agent_node
+@within_budget
 def web_agent(state):
     """web agent where it crawls the data for present informations"""
 
@@ -9,7 +13,8 @@ def web_agent(state):
     tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 
-    response = tavily_client.search(query=query, search_depth="advanced")
+    with track_outbound("tavily"):
+        response = tavily_client.search(query=query, search_depth="advanced")
 
 
     # Step 2: Crawl each URL
@@ -4,6 +4,7 @@ from .document_routes import document_bp
 
 from .agent_routes import agent_bp
 from .travelsgent_routes import travel_agent_bp
+from .metrics_routes import metrics_bp
 
 # Define what's available when someone does "from api import *"
-__all__ = ['chat_bp', 'document_bp', 'agent_bp', 'travel_agent_bp']
\ No newline at end of file
+__all__ = ['chat_bp', 'document_bp', 'agent_bp', 'travel_agent_bp', 'metrics_bp']
\ No newline at end of file
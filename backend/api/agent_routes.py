@@ -1,24 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from backend.graph import build_agent_graph
 from backend.schema import AgentState
-from queue import Queue
-import threading
-import asyncio
+from backend.factory.client_registry import get_embeddings
+from backend.services.semantic_cache import collection_key, semantic_cache
+from backend.utils.helpers import format_sse
+from backend.utils.event_loop import iterate_async, run_async
+from backend.utils.tracing import annotate, span
+import json
 
 
 agent_bp = Blueprint('agent', __name__)
 
 agent_graph = build_agent_graph()
 
-def run_agent_in_thread(graph, initial_state, result_queue):
-    """Runs the async agent and puts the result in a queue."""
-    try:
-        # This is the blocking call, now safely in a background thread
-        final_state = asyncio.run(graph.ainvoke(initial_state))
-        result_queue.put(final_state)
-    except Exception as e:
-        result_queue.put({"error": str(e)})
-
 @agent_bp.route("/invoke_agent", methods=["POST"])
 def invoke_agent():
     data = request.get_json()
@@ -26,27 +20,133 @@ def invoke_agent():
     config = data.get("config", {})
     if not query:
         return jsonify({"error": "Query is required"}), 400
-    
-    initial_state = AgentState(
-        query=query,
-        config=config,
-        next_agent="supervisor"  # Start with the supervisor agent
-    )
-    result_queue = Queue()
-    thread = threading.Thread(
-        target=run_agent_in_thread,
-        args=(agent_graph, initial_state.dict(), result_queue)
-    )
-    thread.start()
-    final_state = result_queue.get()
-    if "error" in final_state:
-        return jsonify({"error": f"Agent execution failed: {final_state['error']}"}), 500
-
-   # final_state = asyncio.run(agent_graph.ainvoke(initial_state))
-    return jsonify({
+
+    with span("invoke_agent", root=True, query=query[:200]) as trace:
+        trace_id = trace.trace_id if trace is not None else None
+        # Near-identical questions with the same config are answered from the semantic cache
+        query_embedding = get_embeddings().embed_query(query)
+        namespace = f"agent:{json.dumps(config, sort_keys=True, default=str)}"
+        cached = semantic_cache.lookup(namespace, query_embedding)
+        annotate(semantic_cache_hit=cached is not None)
+        if cached is not None:
+            return jsonify({**cached, "cached": True, "trace_id": trace_id}), 200
+
+        initial_state = AgentState(
+            query=query,
+            config=config,
+            next_agent="supervisor"  # Start with the supervisor agent
+        )
+        try:
+            # Runs on the shared event loop instead of a new thread and loop per request
+            final_state = run_async(agent_graph.ainvoke(initial_state.dict()))
+        except Exception as e:
+            final_state = {"error": str(e)}
+        if final_state.get("error"):
+            annotate(error=final_state["error"])
+            return jsonify({"error": f"Agent execution failed: {final_state['error']}", "trace_id": trace_id}), 500
+
+        response = build_agent_response(final_state)
+        annotate(iterations=response["iterations"], tokens=response["tokens_used"])
+        cache_agent_response(namespace, config, query, query_embedding, final_state, response)
+        return jsonify({**response, "trace_id": trace_id}), 200
+
+
+def build_agent_response(final_state):
+    return {
         "final_answer": final_state.get("final_answer", ""),
         "feedback": final_state.get("feedback", ""),
         "is_valid": final_state.get("is_valid"),
         "sources": final_state.get("sources", []),
-        "answer_source": final_state.get("answer_source")
-    }), 200
\ No newline at end of file
+        "answer_source": final_state.get("answer_source"),
+        "iterations": final_state.get("iterations", 0),
+        "tokens_used": final_state.get("tokens_used", 0),
+        "budget_exhausted": final_state.get("budget_exhausted", False)
+    }
+
+
+def cache_agent_response(namespace, config, query, query_embedding, final_state, response):
+    # Live web answers go stale quickly, so only cache answers from documents or the LLM
+    if response["is_valid"] and not final_state.get("web_data"):
+        semantic_cache.store(namespace, collection_key(config), query, query_embedding, response)
+
+
+def node_progress(node, update):
+    """The fields of a node's state update worth showing while the agent runs"""
+    progress = {"node": node}
+    if node == "supervisor":
+        progress.update(next_agent=update.get("next_agent"), iteration=update.get("iterations"))
+    elif node == "rag":
+        progress.update(documents=len(update.get("context") or []), error=update.get("error"))
+    elif node == "web":
+        progress.update(results=len(update.get("web_data") or []))
+    elif node == "llm":
+        progress.update(answer_source=update.get("answer_source"))
+    elif node == "validator":
+        progress.update(
+            is_valid=update.get("is_valid"),
+            feedback=update.get("feedback"),
+            budget_exhausted=update.get("budget_exhausted"),
+        )
+    return progress
+
+
+@agent_bp.route("/invoke_agent/stream", methods=["POST"])
+def invoke_agent_stream():
+    """Runs the agent like /invoke_agent, streaming server-sent events as it goes.
+
+    Emits a "progress" event after each node, "token" events with the answering
+    LLM's deltas (a retry starts a new attempt), and a final "done" event with
+    the /invoke_agent response, or an "error" event.
+    """
+    data = request.get_json()
+    query = data.get("query", "")
+    config = data.get("config", {})
+    if not query:
+        return jsonify({"error": "Query is required"}), 400
+
+    namespace = f"agent:{json.dumps(config, sort_keys=True, default=str)}"
+    initial_state = AgentState(query=query, config=config, next_agent="supervisor")
+
+    def events():
+        with span("invoke_agent", root=True, query=query[:200], stream=True) as trace:
+            trace_id = trace.trace_id if trace is not None else None
+            query_embedding = get_embeddings().embed_query(query)
+            cached = semantic_cache.lookup(namespace, query_embedding)
+            annotate(semantic_cache_hit=cached is not None)
+            if cached is not None:
+                yield format_sse("done", {**cached, "cached": True, "trace_id": trace_id})
+                return
+
+            final_state = initial_state.dict()
+            try:
+                # Runs on the shared event loop; only the next event is waited for in this request thread
+                stream = agent_graph.astream(initial_state, stream_mode=["updates", "messages"])
+                for mode, chunk in iterate_async(stream):
+                    if mode == "messages":
+                        message, metadata = chunk
+                        # Only the answering LLM streams tokens; routing and validation calls stay internal
+                        if metadata.get("langgraph_node") == "llm" and message.content:
+                            yield format_sse("token", {"delta": message.content, "attempt": final_state.get("iterations")})
+                        continue
+                    for node, update in chunk.items():
+                        if hasattr(update, "model_dump"):
+                            update = update.model_dump()
+                        update = update or {}
+                        final_state.update(update)
+                        yield format_sse("progress", node_progress(node, update))
+            except Exception as e:
+                print(f"ERROR: Agent stream failed. Error: {e}")
+                annotate(error=str(e))
+                yield format_sse("error", {"error": f"Agent execution failed: {e}", "trace_id": trace_id})
+                return
+
+            response = build_agent_response(final_state)
+            annotate(iterations=response["iterations"], tokens=response["tokens_used"])
+            cache_agent_response(namespace, config, query, query_embedding, final_state, response)
+            yield format_sse("done", {**response, "trace_id": trace_id})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
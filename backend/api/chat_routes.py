@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify
-from backend.services.chat_service import process_message
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend.services.chat_service import process_message, stream_message
+from backend.utils.helpers import format_sse
+from backend.utils.tracing import span
 
 chat_bp = Blueprint('chat', __name__)
 
@@ -12,6 +14,25 @@ def send_message():
     message = data['message']
     search_type_str = data.get('search_type', 'knnBeta')
    
-    result = process_message(message,search_type_str)
-    
-    return jsonify({"answer": result})
\ No newline at end of file
+    with span("send_message", root=True, search_type=search_type_str) as trace:
+        result = process_message(message,search_type_str)
+
+    return jsonify({"answer": result, "trace_id": trace.trace_id if trace is not None else None})
+
+
+@chat_bp.route('/send-message/stream', methods=['POST'])
+def send_message_stream():
+    """Same as /send-message, but streams retrieval, token and done events as server-sent events"""
+    data = request.json
+    if not data or 'message' not in data:
+        return jsonify({"error": "No message provided"}), 400
+
+    message = data['message']
+    search_type_str = data.get('search_type', 'knnBeta')
+
+    events = (format_sse(event, payload) for event, payload in stream_message(message, search_type_str))
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
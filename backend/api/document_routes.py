@@ -1,20 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from backend.utils.enums import IndexMechanism
 from werkzeug.utils import secure_filename
+import json
 import os
-import asyncio
-from backend.services.document_service import extract_topics_from_documents
-from backend.services.document_service import list_documents
-from backend.services.document_service import (
-    process_file, 
-    process_text
-)
+import shutil
 import uuid
-import threading
+from backend.utils.event_loop import iterate_async, run_async
+from backend.services.job_queue import QueueFull, job_queue
+from backend.services.document_service import list_topics
+from backend.services.document_service import list_documents, stream_documents
+from backend.services.document_service import process_text
 
 UPLOAD_FOLDER = 'uploads'
 document_bp = Blueprint('document', __name__)
-upload_statuses = {}
 
 @document_bp.route('/upload-file', methods=['POST'])
 def upload_file_route():
@@ -26,22 +24,35 @@ def upload_file_route():
         return jsonify({"error": "No file selected"}), 400
 
     config = request.form.to_dict()
-    job_id = str(uuid.uuid4())
-    upload_statuses[job_id] = {"status": "pending", "message": "Upload received, job is starting."}
     filename = secure_filename(file.filename)
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
+    # Each upload gets its own directory so queued files with the same name do not overwrite each other
+    upload_dir = os.path.join(UPLOAD_FOLDER, uuid.uuid4().hex)
+    os.makedirs(upload_dir, exist_ok=True)
+    filepath = os.path.join(upload_dir, filename)
     file.save(filepath)
-    # Process file
-    thread = threading.Thread(target=asyncio.run, args=(process_file(filepath, config, job_id, upload_statuses),))
-    thread.start()
-    return jsonify({"message": "File upload started.", "job_id": job_id}), 202
+    try:
+        job_id = job_queue.enqueue(filepath, config)
+    except QueueFull as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        response = jsonify({"error": str(e), "retry_after": e.retry_after})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 429
+    return jsonify({"message": "File upload queued.", "job_id": job_id}), 202
 
 @document_bp.route('/upload-status/<job_id>', methods=['GET'])
 def get_upload_status(job_id):
     """Endpoint for the UI to poll for progress updates."""
-    status = upload_statuses.get(job_id, {"status": "not_found", "message": "Job ID not found."})
+    status = job_queue.status(job_id) or {"status": "not_found", "message": "Job ID not found."}
     return jsonify(status)
 
+@document_bp.route('/upload-cancel/<job_id>', methods=['POST'])
+def cancel_upload(job_id):
+    """Cancels a queued upload, or stops a running one after its current batch."""
+    status = job_queue.cancel(job_id)
+    if status is None:
+        return jsonify({"status": "not_found", "message": "Job ID not found."}), 404
+    return jsonify(status), 202
+
 @document_bp.route('/upload-text', methods=['POST'])
 def upload_text_route():
     data = request.json
@@ -50,20 +61,47 @@ def upload_text_route():
 
     text_content = data.get("text")
     config = data.get("config", {})
-    result = asyncio.run(process_text(text_content, config=config))
-    return jsonify({"answer": result})
+    result = run_async(process_text(text_content, config=config))
+    return jsonify(result)
+
+def _listing_args():
+    fields = request.args.get("fields")
+    return {
+        "after": request.args.get("after"),
+        "fields": [field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+    }
 
 @document_bp.route('/list_documents', methods=['GET'])
 def list_documents_route():
-    documents = asyncio.run(list_documents())
-    return jsonify({"documents": documents})
+    """
+    Returns one page of documents without their text and vectors.
+    Optional query params: limit (default 20), after (next_after of the previous page), fields (comma separated)
+    """
+    limit = min(int(request.args.get("limit", 20)), 1000)
+    documents = run_async(list_documents(limit=limit, **_listing_args()))
+    next_after = documents[-1]["_id"] if len(documents) == limit else None
+    return jsonify({"documents": documents, "next_after": next_after})
+
+@document_bp.route('/list_documents/stream', methods=['GET'])
+def stream_documents_route():
+    """Streams every document (from after, if given) as newline-delimited JSON."""
+    def lines():
+        for batch in iterate_async(stream_documents(**_listing_args())):
+            yield "".join(json.dumps(doc, default=str) + "\n" for doc in batch)
+
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
 
 @document_bp.route('/list_topics', methods=['GET'])
 def list_topics_route():
     """
-    Returns a list of topics/keywords extracted from the stored documents.
-    Optional query param: limit (default 20)
+    Returns the topics of a collection, most frequent first, as extracted at ingestion.
+    Optional query params: vectordb, collection_name, limit (default 20), offset (default 0)
     """
-    limit = int(request.args.get("limit", 20))
-    topics = asyncio.run(extract_topics_from_documents(limit=limit))
-    return jsonify({"topics": topics})
\ No newline at end of file
+    limit = min(int(request.args.get("limit", 20)), 500)
+    offset = int(request.args.get("offset", 0))
+    config = {
+        "vectordb": request.args.get("vectordb", "milvus"),
+        "collection_name": request.args.get("collection_name", "documents"),
+    }
+    topics, total = run_async(list_topics(config, limit=limit, offset=offset))
+    return jsonify({"topics": topics, "total": total, "limit": limit, "offset": offset})
@@ -0,0 +1,28 @@
+from flask import Blueprint, Response, jsonify
+from backend.utils.metrics import metrics_registry
+from backend.utils.tracing import sink
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Latency histograms, counters and gauges in the Prometheus text format"""
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route('/traces/<trace_id>', methods=['GET'])
+def trace(trace_id):
+    """The spans of one request, by the trace_id returned in its response, oldest first"""
+    spans = [{
+        "name": span["name"],
+        "span_id": span["spanId"],
+        "parent_id": span.get("parentSpanId"),
+        "start_ns": int(span["startTimeUnixNano"]),
+        "duration_ms": round((int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6, 3),
+        "attributes": {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]},
+        "error": span["status"].get("message"),
+    } for span in sink.find(trace_id)]
+    if not spans:
+        return jsonify({"error": "Trace not found (spans are written within a second of the request)"}), 404
+    return jsonify({"trace_id": trace_id, "spans": spans})
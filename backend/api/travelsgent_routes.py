@@ -1,6 +1,7 @@
 import uuid
 from flask import Blueprint, request, jsonify
 from backend.travel_planner_graph import build_agent_graph
+from backend.tools.base_tools import tool_cache
 
 travel_agent_bp = Blueprint('travel_agent_bp', __name__)
 graph = build_agent_graph()
@@ -18,4 +19,9 @@ async def travelsgent():
         "final_answer": result.get("final_answer", ""),
         "thread_id": thread_id,
         "messages": result.get("messages", [])
-    })
\ No newline at end of file
+    })
+
+@travel_agent_bp.route('/travelsgent/cache-stats', methods=['GET'])
+def travelsgent_cache_stats():
+    """Hit-rate counters of the travel tool response cache."""
+    return jsonify(tool_cache.stats())
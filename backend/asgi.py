@@ -0,0 +1,38 @@
+"""ASGI entry point.
+
+    uvicorn backend.asgi:app --port 5000
+
+The Flask handlers run on a bounded worker pool while all async work (the agent
+graphs, ingestion, async HTTP clients) runs on the server's own event loop,
+shared by every request.
+"""
+import asyncio
+from a2wsgi import WSGIMiddleware
+from backend.main import create_app, start_background_services
+from backend.utils.event_loop import use_loop
+from backend.utils.http_client import close_async_client
+from backend.config.default_config import ASGI_WORKERS
+
+flask_app = create_app()
+_wsgi = WSGIMiddleware(flask_app, workers=ASGI_WORKERS)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Coroutines submitted by the handlers run on the server loop
+            use_loop(asyncio.get_running_loop())
+            start_background_services()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    else:
+        await _wsgi(scope, receive, send)
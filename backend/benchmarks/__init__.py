@@ -0,0 +1 @@
+"""Offline benchmarks. Run a module directly, e.g. ``python -m backend.benchmarks.mmr_bench``."""
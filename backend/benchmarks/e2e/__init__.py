@@ -0,0 +1,8 @@
+"""Offline end-to-end benchmark of the agent graph, chat, ingestion and travel planner pipelines.
+
+Every external service is replaced by a deterministic local stand-in: a fake
+chat model and hash-based embeddings behind the client registry, a Chroma
+collection in a scratch directory, and a stub HTTP server for the travel APIs.
+
+    python -m backend.benchmarks.e2e [--iterations 20] [--thresholds PATH]
+"""
@@ -0,0 +1,3 @@
+from backend.benchmarks.e2e.bench import main
+
+main()
@@ -0,0 +1,311 @@
+"""Offline end-to-end benchmark of the four request pipelines.
+
+ingest  document_service.process_file on a fresh text document per iteration
+chat    chat_service.process_message with a new question per iteration
+agent   the graph from graph.build_agent_graph, timed per node
+travel  TravelPlanner.plan over the app's tools, timed per tool, with cold caches
+
+The OpenAI, Tavily and Milvus clients are replaced by the stand-ins in
+fakes.py and the travel APIs by stub_server.py, all with configurable latency,
+so results are repeatable and free. Every vector store resolves to a Chroma
+collection in a scratch directory. p50/p95/p99 are reported per pipeline and
+per stage; the run exits with status 1 when a limit in --thresholds is
+exceeded, or a p95 is more than --tolerance slower than in --baseline.
+
+    python -m backend.benchmarks.e2e [--iterations 20] [--pipelines ingest,chat,agent,travel]
+                                     [--thresholds PATH] [--baseline PATH] [--output PATH]
+
+baseline.json is a measured run with the default latencies and 20 iterations
+on a 1-CPU container; thresholds.json allows 1.5x its p95/p99 (at least +50 ms
+and +100 ms). Re-measure both when a pipeline deliberately changes.
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from backend.benchmarks.e2e.stub_server import FORECAST_START, StubServer
+from backend.benchmarks.e2e.timings import Timings
+
+PIPELINES = ("ingest", "chat", "agent", "travel")
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+ROUTES = {"rag": "A", "web": "B", "llm": "C"}
+
+# The chat endpoint answers from the default collection, so ingest into the same one
+BENCH_CONFIG = {"vectordb": "milvus", "collection_name": "documents"}
+
+QUESTIONS = (
+    "What is the difference between an interface and an abstract class",
+    "How does the garbage collector decide which objects to reclaim",
+    "When should a method return a Task instead of void",
+    "Explain boxing and unboxing of value types",
+    "What does the async keyword change about a method",
+)
+
+PARAGRAPH = (
+    "A class can implement several interfaces but inherits from exactly one base class. Value types are "
+    "copied on assignment while reference types share one instance. The garbage collector reclaims objects "
+    "that are no longer reachable from any root. Async methods return a task that completes when the awaited "
+    "work finishes, and the calling thread is free to do other work in the meantime."
+)
+
+
+def offline_environment(workdir: str, stub_host: str):
+    """Points settings at the scratch directory and the stub server.
+
+    Settings are read when backend.config is first imported, so this must run before any other backend import.
+    """
+    os.environ.update({
+        "DATA_DIR": os.path.join(workdir, "data"),
+        "OPEN_WEATHER_ENDPOINT": f"http://{stub_host}/weather",
+        "GOOGLE_PLACES_ENDPOINT": f"http://{stub_host}/places",
+        "AMADEUS_HOST": stub_host,
+        "AMADEUS_API_KEY": "offline",
+        "AMADEUS_API_SECRET": "offline",
+        "OPENAI_API_KEY": "offline",
+        "TAVILY_API_KEY": "offline",
+        "TOPICS_ENABLED": "false",
+        # Without routing examples every decision goes through the fake LLM, which answers `route`
+        "ROUTER_EXAMPLES_PATH": os.path.join(workdir, "no_routing_examples.jsonl"),
+    })
+    os.makedirs(os.path.join(workdir, "uploads"), exist_ok=True)
+    os.chdir(workdir)
+
+
+def install_fakes(workdir: str, timings: Timings, args):
+    """Routes the client registry, the Tavily clients and the exchange rates to local stand-ins."""
+    from backend.benchmarks.e2e.fakes import (
+        FakeChatModel,
+        FakeTavilyClient,
+        FakeTavilySearchResults,
+        HashEmbeddings,
+        TimedChroma,
+    )
+    from backend.factory.client_registry import get_embeddings, registry
+    from backend.services.fx_service import fx_rates
+    from backend.utils.embedding_cache import CachedEmbeddings, get_embedding_cache
+
+    registry.override("embeddings", lambda model: CachedEmbeddings(
+        HashEmbeddings(latency=args.embed_latency, per_text=args.embed_latency_per_text, timings=timings),
+        model=f"offline-{model}",
+        cache=get_embedding_cache(),
+    ))
+    registry.override("llm", lambda model_name, temperature, max_tokens: FakeChatModel(
+        route=ROUTES[args.route], latency=args.llm_latency, token_latency=args.token_latency, timings=timings,
+    ))
+
+    def chroma(collection_name, model, *_):
+        return TimedChroma(
+            embedding_function=get_embeddings(model),
+            collection_name=collection_name,
+            persist_directory=os.path.join(workdir, "chroma"),
+            timings=timings,
+        )
+
+    registry.override("milvus", chroma)
+    registry.override("chroma", chroma)
+
+    FakeTavilyClient.latency = FakeTavilySearchResults.latency = args.search_latency
+    importlib.import_module("backend.agents.web_agent").TavilyClient = FakeTavilyClient
+    importlib.import_module("backend.tools.budget_calculator").TavilySearchResults = FakeTavilySearchResults
+
+    rates_path = os.path.join(workdir, "fx_rates.json")
+    with open(rates_path, "w") as f:
+        json.dump({"base": "USD", "rates": {"EUR": 0.92, "GBP": 0.79, "INR": 83.1, "JPY": 151.4}}, f)
+    fx_rates.load_file(rates_path)
+
+
+def run_ingest(timings: Timings, iterations: int, workdir: str):
+    from backend.services.document_service import process_file
+    from backend.utils.event_loop import run_async
+
+    statuses = {}
+    for i in range(iterations):
+        path = os.path.join(workdir, "uploads", f"bench-{i}.txt")
+        with open(path, "w") as f:
+            f.write("\n\n".join(f"Document {i}, section {section}. {PARAGRAPH}" for section in range(40)))
+        job_id = f"bench-{i}"
+        with timings.time("total"):
+            run_async(process_file(path, BENCH_CONFIG, job_id, statuses))
+        if statuses[job_id]["status"] != "complete":
+            raise RuntimeError(f"process_file failed: {statuses[job_id]['message']}")
+
+
+def run_chat(timings: Timings, iterations: int):
+    from backend.services.chat_service import process_message
+
+    for i in range(iterations):
+        # A new question every time, so the semantic cache does not answer it
+        with timings.time("total"):
+            result = process_message(f"{QUESTIONS[i % len(QUESTIONS)]} (variant {i})?")
+        if not isinstance(result, dict) or "answer" not in result:
+            raise RuntimeError(f"process_message failed: {result}")
+
+
+async def _time_graph(graph, state, timings: Timings):
+    start = previous = time.perf_counter()
+    async for update in graph.astream(state, stream_mode="updates"):
+        now = time.perf_counter()
+        for node in update:
+            timings.record(f"node.{node}", now - previous)
+        previous = now
+    timings.record("total", previous - start)
+
+
+def run_agent(timings: Timings, iterations: int):
+    from backend.graph import build_agent_graph
+    from backend.schema import AgentState
+    from backend.utils.event_loop import run_async
+
+    graph = build_agent_graph()
+    for i in range(iterations):
+        state = AgentState(query=f"{QUESTIONS[i % len(QUESTIONS)]} (variant {i})?", config=dict(BENCH_CONFIG))
+        run_async(_time_graph(graph, state.dict(), timings))
+
+
+def run_travel(timings: Timings, iterations: int):
+    from backend.main import tools_list
+    from backend.planner.travel_planner import TravelPlanner
+    from backend.state_schema.travel_planner_schema import TravelPlannerState
+    from backend.tools.base_tools import TravelTool
+    from backend.utils.event_loop import run_async
+
+    class TimedTool(TravelTool):
+        """Delegates to a tool and records how long its run() took, cache included."""
+
+        def __init__(self, tool):
+            self.tool = tool
+            self.reads = tool.reads
+            self.writes = tool.writes
+
+        async def execute(self, state):
+            return await self.tool.execute(state)
+
+        async def run(self, state):
+            start = time.perf_counter()
+            try:
+                return await self.tool.run(state)
+            finally:
+                timings.record(f"tool.{type(self.tool).__name__}", time.perf_counter() - start)
+
+    planner = TravelPlanner([TimedTool(tool) for tool in tools_list])
+    for i in range(iterations):
+        # Destination and party size are new every time, so every tool misses its cache
+        state = TravelPlannerState(query={
+            "destination": f"Barcelona district {i}",
+            "from": "LIS",
+            "to": "BCN",
+            "start_date": FORECAST_START,
+            "return_date": "2026-06-05",
+            "nights": 4,
+            "adults": i + 1,
+            "currency": "EUR",
+        })
+        with timings.time("total"):
+            run_async(planner.plan(state))
+
+
+def check(summary: dict, thresholds: dict, baseline: dict = None, tolerance: float = 0.2, min_delta_ms: float = 10):
+    """Returns one message per limit that was exceeded.
+
+    A p95 only regresses against the baseline when it is both more than tolerance
+    and more than min_delta_ms slower, so millisecond-scale stages do not flap.
+    """
+    failures = []
+    for name, limits in thresholds.items():
+        if name not in summary:
+            continue
+        for percentile, limit_ms in limits.items():
+            if summary[name][percentile] > limit_ms:
+                failures.append(f"{name} {percentile} {summary[name][percentile]:.1f} ms > limit {limit_ms} ms")
+    for name, stats in (baseline or {}).items():
+        if name not in summary:
+            continue
+        slower_ms = summary[name]["p95"] - stats["p95"]
+        if summary[name]["p95"] > stats["p95"] * (1 + tolerance) and slower_ms > min_delta_ms:
+            failures.append(
+                f"{name} p95 {summary[name]['p95']:.1f} ms > baseline {stats['p95']:.1f} ms + {tolerance:.0%}"
+            )
+    return failures
+
+
+def run(args):
+    timings = Timings()
+    workdir = tempfile.mkdtemp(prefix="e2e-bench-")
+    cwd = os.getcwd()
+    server = StubServer(latency=args.api_latency).start()
+    try:
+        offline_environment(workdir, server.host)
+        install_fakes(workdir, timings, args)
+        # The pipelines build on each other: chat and agent search the ingested documents
+        for pipeline in args.pipelines:
+            with timings.scope(pipeline):
+                if pipeline == "ingest":
+                    run_ingest(timings, args.iterations, workdir)
+                elif pipeline == "chat":
+                    run_chat(timings, args.iterations)
+                elif pipeline == "agent":
+                    run_agent(timings, args.iterations)
+                else:
+                    run_travel(timings, args.iterations)
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return timings.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--pipelines", default=",".join(PIPELINES),
+                        type=lambda value: [p for p in value.split(",") if p])
+    parser.add_argument("--route", choices=sorted(ROUTES), default="rag", help="agent the fake LLM router picks")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds to the first token")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="seconds per further token")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="seconds per embedding call")
+    parser.add_argument("--embed-latency-per-text", type=float, default=0.0005)
+    parser.add_argument("--search-latency", type=float, default=0.3, help="seconds per Tavily search")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="seconds per travel API request")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="JSON {name: {p50|p95|p99: ms}}")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown over --baseline")
+    parser.add_argument("--min-delta", type=float, default=10, help="ms a p95 may always exceed --baseline by")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    args = parser.parse_args()
+    unknown = set(args.pipelines) - set(PIPELINES)
+    if unknown:
+        parser.error(f"unknown pipelines {sorted(unknown)}; choose from {PIPELINES}")
+
+    summary = run(args)
+
+    print(f"iterations={args.iterations} llm_latency={args.llm_latency}s api_latency={args.api_latency}s "
+          f"search_latency={args.search_latency}s route={args.route}")
+    print(f"{'stage':<44} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, stats in summary.items():
+        print(f"{name:<44} {stats['count']:>6} {stats['p50']:>10.1f} {stats['p95']:>10.1f} {stats['p99']:>10.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check(summary, thresholds, baseline, args.tolerance, args.min_delta)
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Deterministic local stand-ins for the OpenAI, Tavily and vector store clients."""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_community.vectorstores import Chroma
+
+WORDS = (
+    "a class can implement several interfaces while it inherits from one base class the garbage "
+    "collector reclaims objects that are no longer reachable async methods return a task that "
+    "completes when the awaited work finishes value types are copied and reference types are shared"
+).split()
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _prompt_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class HashEmbeddings(Embeddings):
+    """Unit vectors seeded by a hash of the text, so equal texts get equal vectors.
+
+    Each call sleeps latency seconds plus per_text for every text, like a batched API call.
+    """
+
+    def __init__(self, size: int = 1536, latency: float = 0.0, per_text: float = 0.0, timings=None):
+        self.size = size
+        self.latency = latency
+        self.per_text = per_text
+        self.timings = timings
+
+    def _vector(self, text: str):
+        vector = np.random.default_rng(_seed(text)).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        time.sleep(self.latency + self.per_text * len(texts))
+        vectors = [self._vector(text) for text in texts]
+        if self.timings is not None:
+            self.timings.record("embed", time.perf_counter() - start)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers the repo's prompts deterministically after a simulated delay.
+
+    Router prompts get route (A, B or C), validator prompts a valid verdict and
+    everything else an answer of answer_words words picked from a hash of the
+    prompt. latency is the time to the first token and token_latency the time per
+    further token; usage metadata counts words as tokens.
+    """
+
+    route: str = "A"
+    answer_words: int = 60
+    latency: float = 0.2
+    token_latency: float = 0.002
+    timings: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-fake-chat"
+
+    def _respond(self, prompt: str) -> str:
+        if "intelligent router" in prompt:
+            return json.dumps({"agent": self.route})
+        if "validation agent" in prompt:
+            return json.dumps({"is_valid": True, "reason": "Grounded in the context.", "score": 0.9})
+        if prompt.startswith("What is the average"):
+            return f"About {_seed(prompt) % 150 + 10} per day."
+        rng = np.random.default_rng(_seed(prompt))
+        return " ".join(WORDS[i] for i in rng.integers(0, len(WORDS), self.answer_words)).capitalize() + "."
+
+    def _message(self, prompt: str, content: str) -> AIMessage:
+        input_tokens, output_tokens = len(prompt.split()), len(content.split())
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+
+    def _delay(self, content: str) -> float:
+        return self.latency + self.token_latency * max(len(content.split()) - 1, 0)
+
+    def _record(self, start: float):
+        if self.timings is not None:
+            self.timings.record("llm", time.perf_counter() - start)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        start = time.perf_counter()
+        prompt = _prompt_text(messages)
+        content = self._respond(prompt)
+        time.sleep(self._delay(content))
+        self._record(start)
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        start = time.perf_counter()
+        prompt = _prompt_text(messages)
+        content = self._respond(prompt)
+        await asyncio.sleep(self._delay(content))
+        self._record(start)
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, content))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        start = time.perf_counter()
+        content = self._respond(_prompt_text(messages))
+        time.sleep(self.latency)
+        for i, word in enumerate(content.split(" ")):
+            if i:
+                time.sleep(self.token_latency)
+            token = word if i == 0 else " " + word
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        self._record(start)
+
+
+class TimedChroma(Chroma):
+    """Chroma collection that records its upsert and search latencies."""
+
+    def __init__(self, *args, timings=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = timings
+
+    def add_documents(self, documents, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().add_documents(documents, **kwargs)
+        finally:
+            self.timings.record("upsert", time.perf_counter() - start)
+
+    def similarity_search_with_score(self, query, k=4, filter=None, where_document=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().similarity_search_with_score(query, k=k, filter=filter, where_document=where_document, **kwargs)
+        finally:
+            self.timings.record("search", time.perf_counter() - start)
+
+
+class FakeTavilyClient:
+    """Stand-in for tavily.TavilyClient used by the web agent."""
+
+    latency = 0.3
+
+    def __init__(self, api_key=None, **kwargs):
+        pass
+
+    def search(self, query, **kwargs):
+        time.sleep(self.latency)
+        rng = np.random.default_rng(_seed(query))
+        return {"results": [
+            {"url": f"https://example.com/{i}", "content": " ".join(WORDS[j] for j in rng.integers(0, len(WORDS), 40))}
+            for i in range(5)
+        ]}
+
+
+class FakeTavilySearchResults:
+    """Stand-in for the LangChain Tavily tool used by the budget calculator."""
+
+    latency = 0.3
+
+    def __init__(self, api_key=None, **kwargs):
+        pass
+
+    def _results(self, query):
+        return [{"url": "https://example.com/prices", "content": f"Travellers report an average of {_seed(query) % 150 + 10} USD."}]
+
+    def invoke(self, query, **kwargs):
+        time.sleep(self.latency)
+        return self._results(query)
+
+    async def ainvoke(self, query, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._results(query)
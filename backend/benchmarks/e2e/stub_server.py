@@ -0,0 +1,100 @@
+"""Local stand-in for the OpenWeather, Google Places and Amadeus APIs used by the travel tools."""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FORECAST_START = "2026-06-01"
+FORECAST_DAYS = 14
+
+
+def _forecast():
+    start = datetime.strptime(FORECAST_START, "%Y-%m-%d")
+    entries = []
+    for hour in range(0, FORECAST_DAYS * 24, 3):
+        at = start + timedelta(hours=hour)
+        entries.append({
+            "dt_txt": at.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": 15 + (hour % 24) / 3},
+            "weather": [{"description": "scattered clouds" if hour % 2 else "clear sky"}],
+        })
+    return {"list": entries}
+
+
+def _places(params):
+    query = params.get("query", [""])[0]
+    return {"status": "OK", "results": [{"name": f"{query} #{i}"} for i in range(10)]}
+
+
+def _flight_offers(params):
+    date = params.get("departureDate", [FORECAST_START])[0]
+    return {"data": [
+        {
+            "itineraries": [{"segments": [
+                {"carrierCode": "XX", "departure": {"at": f"{date}T0{i}:00:00"}, "arrival": {"at": f"{date}T1{i}:30:00"}},
+            ]}],
+            "price": {"total": f"{120 + 15 * i}.00", "currency": "EUR"},
+        }
+        for i in range(5)
+    ]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, body):
+        time.sleep(self.server.latency)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/weather":
+            self._reply(self.server.forecast)
+        elif url.path == "/places":
+            self._reply(_places(params))
+        elif url.path == "/v2/shopping/flight-offers":
+            self._reply(_flight_offers(params))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if urlparse(self.path).path == "/v1/security/oauth2/token":
+            self._reply({"type": "amadeusOAuth2Token", "access_token": "offline", "expires_in": 1799,
+                         "token_type": "Bearer", "state": "approved"})
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Serves the stand-in APIs on 127.0.0.1 from a daemon thread; every response waits latency seconds."""
+
+    def __init__(self, latency: float = 0.05):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.latency = latency
+        self._server.forecast = _forecast()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-apis", daemon=True)
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,50 @@
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class Timings:
+    """Latency samples per "pipeline.stage" name.
+
+    The stand-ins record into the pipeline set with scope(), so the same fake
+    embedding or vector store call is attributed to whichever pipeline is running.
+    """
+
+    def __init__(self):
+        self.pipeline = "setup"
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self, pipeline: str):
+        previous, self.pipeline = self.pipeline, pipeline
+        try:
+            yield
+        finally:
+            self.pipeline = previous
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(f"{self.pipeline}.{stage}", []).append(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """{name: {"count", "p50", "p95", "p99"}} with latencies in milliseconds."""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+        summary = {}
+        for name, values in sorted(samples.items()):
+            percentiles = np.percentile(np.asarray(values) * 1000, PERCENTILES)
+            summary[name] = {"count": len(values)}
+            summary[name].update({f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, percentiles)})
+        return summary
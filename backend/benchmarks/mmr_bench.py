@@ -0,0 +1,59 @@
+"""Microbenchmark of the MMR selection step in backend.retrievers.mmr_retriever.
+
+Measures the per-query cost of mmr_select (candidates already fetched) across
+k and fetch_k, next to LangChain's reference maximal_marginal_relevance.
+
+    python -m backend.benchmarks.mmr_bench [--dim 1536] [--repeats 20]
+"""
+import argparse
+import time
+import numpy as np
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+from backend.retrievers.mmr_retriever import mmr_select
+
+K_VALUES = (5, 10, 20, 50)
+FETCH_K_VALUES = (15, 50, 100, 200, 500)
+
+
+def _time_per_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95) - 1]
+
+
+def run(dim: int, repeats: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    query = rng.standard_normal(dim).astype(np.float32)
+    rows = []
+    for fetch_k in FETCH_K_VALUES:
+        candidates = rng.standard_normal((fetch_k, dim)).astype(np.float32)
+        candidate_list = candidates.tolist()
+        for k in K_VALUES:
+            if k > fetch_k:
+                continue
+            p50, p95 = _time_per_call(lambda: mmr_select(query, candidates, k, 0.7), repeats)
+            ref_p50, _ = _time_per_call(
+                lambda: maximal_marginal_relevance(query, candidate_list, lambda_mult=0.7, k=k), repeats
+            )
+            rows.append((k, fetch_k, p50, p95, ref_p50))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=1536, help="embedding dimension (text-embedding-3-small: 1536)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"dim={args.dim} repeats={args.repeats}")
+    print(f"{'k':>4} {'fetch_k':>8} {'p50 ms':>10} {'p95 ms':>10} {'langchain p50 ms':>18} {'speedup':>8}")
+    for k, fetch_k, p50, p95, ref_p50 in run(args.dim, args.repeats):
+        print(f"{k:>4} {fetch_k:>8} {p50 * 1000:>10.3f} {p95 * 1000:>10.3f} {ref_p50 * 1000:>18.3f} {ref_p50 / p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Compares the two ways the API can serve async work.
+
+flask: the previous pattern, the Werkzeug threaded server with a new thread and
+       asyncio.run() (a fresh event loop and async HTTP client) per request.
+asgi:  uvicorn + backend.asgi style wrapping, handlers hand the coroutine to
+       the one shared event loop with run_async().
+
+Each request awaits --latency seconds, standing in for an LLM or HTTP call, so
+the numbers show serving overhead rather than model time. Both servers run in
+subprocesses; memory is the server's RSS growth with --concurrency requests in
+flight, divided by the number of requests.
+
+    python -m backend.benchmarks.serving_bench [--requests 2000] [--concurrency 64] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+import httpx
+from flask import Flask, jsonify, request
+from backend.utils.http_client import get_async_client
+
+
+async def _work(latency: float):
+    # Every request needs the loop's HTTP client, as the travel tools do
+    get_async_client()
+    await asyncio.sleep(latency)
+    return {"ok": True}
+
+
+def _flask_app(mode: str):
+    from backend.utils.event_loop import run_async
+
+    app = Flask(__name__)
+
+    @app.route("/work")
+    def work():
+        latency = float(request.args.get("latency", 0.05))
+        if mode == "asgi":
+            return jsonify(run_async(_work(latency)))
+        result_queue = Queue()
+        thread = threading.Thread(target=lambda: result_queue.put(asyncio.run(_work(latency))))
+        thread.start()
+        return jsonify(result_queue.get())
+
+    return app
+
+
+def _serve(mode: str, port: int):
+    app = _flask_app(mode)
+    if mode == "flask":
+        app.run(port=port, threaded=True)
+        return
+    import uvicorn
+    from a2wsgi import WSGIMiddleware
+    from backend.utils.event_loop import use_loop
+
+    wsgi = WSGIMiddleware(app, workers=256)
+
+    async def asgi_app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    use_loop(asyncio.get_running_loop())
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        else:
+            await wsgi(scope, receive, send)
+
+    uvicorn.run(asgi_app, port=port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _load(url: str, requests: int, concurrency: int, latency: float):
+    with httpx.Client(limits=httpx.Limits(max_connections=concurrency), timeout=60) as client:
+        def call(_):
+            return client.get(url, params={"latency": latency}).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(call, range(requests)))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed, sum(1 for status in statuses if status != 200)
+
+
+def _memory_per_request(url: str, pid: int, concurrency: int):
+    # Warm up, then hold `concurrency` slow requests open and sample RSS while they wait
+    _load(url, concurrency, concurrency, 0.0)
+    idle = _rss_kb(pid)
+    peak = idle
+    load = threading.Thread(target=_load, args=(url, concurrency, concurrency, 2.0))
+    load.start()
+    while load.is_alive():
+        peak = max(peak, _rss_kb(pid))
+        time.sleep(0.05)
+    return (peak - idle) / concurrency
+
+
+def run(mode: str, requests: int, concurrency: int, latency: float):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.benchmarks.serving_bench", "--serve", mode, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/work"
+    try:
+        for _ in range(100):
+            if server.poll() is not None:
+                raise RuntimeError(f"{mode} server exited with code {server.returncode}")
+            try:
+                httpx.get(url, params={"latency": 0})
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"{mode} server did not start")
+        rps, errors = _load(url, requests, concurrency, latency)
+        kb_per_request = _memory_per_request(url, server.pid, concurrency)
+        return rps, errors, kb_per_request
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each request awaits")
+    parser.add_argument("--serve", choices=["flask", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve, args.port)
+        return
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency}s cpus={os.cpu_count()}")
+    print(f"{'mode':>6} {'req/s':>10} {'errors':>8} {'KiB per in-flight request':>27}")
+    for mode in ("flask", "asgi"):
+        rps, errors, kb_per_request = run(mode, args.requests, args.concurrency, args.latency)
+        print(f"{mode:>6} {rps:>10.1f} {errors:>8} {kb_per_request:>27.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Throughput of the token-aware splitters in backend.parsers next to LangChain's splitters.
+
+Splits a synthetic document of --mb megabytes, once as a single string and once
+as a stream of ~3 KB pages (the way ingestion feeds a PDF), and reports MB/s.
+Token sizes are in --encoding tokens; the character splitters get four
+characters per token so chunks are of similar length.
+
+    python -m backend.benchmarks.splitter_bench [--mb 4] [--chunk-size 512] [--chunk-overlap 64]
+"""
+import argparse
+import random
+import time
+from langchain_core.documents import Document
+from langchain_text_splitters import (
+    CharacterTextSplitter,
+    RecursiveCharacterTextSplitter,
+    TokenTextSplitter,
+)
+from backend.parsers.recursive_parser import RecursiveTokenSplitter
+from backend.parsers.simple_parser import TokenSplitter
+
+WORDS = (
+    "the interface method class object inheritance async await delegate generic collection "
+    "exception garbage collector thread task value reference type struct record property event "
+    "dependency injection pattern linq query expression compiler runtime memory allocation"
+).split()
+
+
+def make_text(megabytes: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+            for _ in range(rng.randint(2, 9))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def make_pages(text: str, page_size: int = 3000):
+    return [Document(page_content=text[i:i + page_size], metadata={"page": i // page_size})
+            for i in range(0, len(text), page_size)]
+
+
+def splitters(chunk_size: int, chunk_overlap: int, encoding: str):
+    chars, overlap_chars = chunk_size * 4, chunk_overlap * 4
+    return [
+        ("langchain CharacterTextSplitter (chars)",
+         CharacterTextSplitter(chunk_size=chars, chunk_overlap=overlap_chars)),
+        ("langchain RecursiveCharacterTextSplitter (chars)",
+         RecursiveCharacterTextSplitter(chunk_size=chars, chunk_overlap=overlap_chars)),
+        ("langchain TokenTextSplitter",
+         TokenTextSplitter(encoding_name=encoding, chunk_size=chunk_size, chunk_overlap=chunk_overlap)),
+        ("langchain RecursiveCharacterTextSplitter.from_tiktoken_encoder",
+         RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+             encoding_name=encoding, chunk_size=chunk_size, chunk_overlap=chunk_overlap)),
+        ("TokenSplitter",
+         TokenSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, encoding_name=encoding)),
+        ("RecursiveTokenSplitter",
+         RecursiveTokenSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, encoding_name=encoding)),
+    ]
+
+
+def _throughput(fn, megabytes):
+    start = time.perf_counter()
+    chunks = fn()
+    elapsed = time.perf_counter() - start
+    return megabytes / elapsed, len(chunks)
+
+
+def run(megabytes: float, chunk_size: int, chunk_overlap: int, encoding: str):
+    text = make_text(megabytes)
+    pages = make_pages(text)
+    megabytes = len(text) / (1024 * 1024)
+    rows = []
+    for name, splitter in splitters(chunk_size, chunk_overlap, encoding):
+        whole, whole_chunks = _throughput(lambda: splitter.split_text(text), megabytes)
+        if hasattr(splitter, "lazy_split_documents"):
+            paged, paged_chunks = _throughput(lambda: list(splitter.lazy_split_documents(iter(pages))), megabytes)
+        else:
+            paged, paged_chunks = _throughput(lambda: splitter.split_documents(pages), megabytes)
+        rows.append((name, whole, whole_chunks, paged, paged_chunks))
+    return megabytes, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=4)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--chunk-overlap", type=int, default=64)
+    parser.add_argument("--encoding", default="cl100k_base")
+    args = parser.parse_args()
+
+    megabytes, rows = run(args.mb, args.chunk_size, args.chunk_overlap, args.encoding)
+    print(f"text={megabytes:.1f} MB chunk_size={args.chunk_size} chunk_overlap={args.chunk_overlap} "
+          f"encoding={args.encoding}")
+    print(f"{'splitter':<64} {'whole MB/s':>11} {'chunks':>8} {'paged MB/s':>11} {'chunks':>8}")
+    for name, whole, whole_chunks, paged, paged_chunks in rows:
+        print(f"{name:<64} {whole:>11.2f} {whole_chunks:>8} {paged:>11.2f} {paged_chunks:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+from dotenv import load_dotenv
+
+# Settings are read once at import time, so make sure .env is loaded first
+load_dotenv()
+
+# Model defaults
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Pooled client registry
+CLIENT_POOL_SIZE = int(os.environ.get("CLIENT_POOL_SIZE", 20))
+CLIENT_POOL_TIMEOUT = float(os.environ.get("CLIENT_POOL_TIMEOUT", 30))
+CLIENT_HEALTH_CHECK_SECONDS = float(os.environ.get("CLIENT_HEALTH_CHECK_SECONDS", 60))
+
+# Local state (caches, job queue, registries) lives under this directory
+DATA_DIR = os.environ.get("DATA_DIR", "data")
+
+# Embedding cache
+EMBEDDING_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", os.path.join(DATA_DIR, "embedding_cache.sqlite"))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.environ.get("EMBEDDING_CACHE_MEMORY_ITEMS", 10000))
+EMBEDDING_CACHE_MAX_ITEMS = int(os.environ.get("EMBEDDING_CACHE_MAX_ITEMS", 500000))
+
+# Streaming ingestion
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", 64))
+INGEST_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", 4))
+
+# Shared outbound HTTP client for travel tools
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 50))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 10))
+PLACES_CATEGORY_TIMEOUTS = {
+    "attractions": 10.0,
+    "restaurants": 8.0,
+    "transportation": 6.0,
+    "activities": 8.0,
+    "hotels": 10.0,
+}
+
+# Travel tool response cache; set TRAVEL_CACHE_PATH to add a SQLite tier behind the in-memory LRU
+TRAVEL_CACHE_MAX_ITEMS = int(os.environ.get("TRAVEL_CACHE_MAX_ITEMS", 2048))
+TRAVEL_CACHE_PATH = os.environ.get("TRAVEL_CACHE_PATH")
+
+# Exchange rates; FX_RATES_FILE seeds the table from a JSON file ({"base": "USD", "rates": {...}})
+FX_BASE_CURRENCY = os.environ.get("FX_BASE_CURRENCY", "USD")
+FX_REFRESH_SECONDS = float(os.environ.get("FX_REFRESH_SECONDS", 3600))
+FX_RATES_FILE = os.environ.get("FX_RATES_FILE")
+
+# Keyword index kept next to each vector collection
+BM25_INDEX_DIR = os.environ.get("BM25_INDEX_DIR", os.path.join(DATA_DIR, "bm25"))
+RRF_K = int(os.environ.get("RRF_K", 60))
+
+# Semantic answer cache in front of /send-message and /invoke_agent
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_TTL = float(os.environ.get("SEMANTIC_CACHE_TTL", 3600))
+SEMANTIC_CACHE_MAX_ITEMS = int(os.environ.get("SEMANTIC_CACHE_MAX_ITEMS", 2000))
+
+# Local supervisor routing; the LLM router is only used below the confidence threshold
+ROUTER_EXAMPLES_PATH = os.environ.get(
+    "ROUTER_EXAMPLES_PATH", os.path.join(os.path.dirname(__file__), "routing_examples.jsonl")
+)
+ROUTER_MODEL_PATH = os.environ.get("ROUTER_MODEL_PATH", os.path.join(DATA_DIR, "router_model.json"))
+ROUTER_LOG_PATH = os.environ.get("ROUTER_LOG_PATH", os.path.join(DATA_DIR, "routing_log.jsonl"))
+ROUTER_CONFIDENCE_THRESHOLD = float(os.environ.get("ROUTER_CONFIDENCE_THRESHOLD", 0.6))
+ROUTER_TEMPERATURE = float(os.environ.get("ROUTER_TEMPERATURE", 0.05))
+
+# Per-request budget of the supervisor -> validator loop; config keys max_iterations,
+# deadline_seconds and token_budget override these. A token budget of 0 means unlimited.
+AGENT_MAX_ITERATIONS = int(os.environ.get("AGENT_MAX_ITERATIONS", 3))
+AGENT_DEADLINE_SECONDS = float(os.environ.get("AGENT_DEADLINE_SECONDS", 60))
+AGENT_TOKEN_BUDGET = int(os.environ.get("AGENT_TOKEN_BUDGET", 0))
+
+# ASGI serving mode (backend/asgi.py): threads that run the Flask handlers
+ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", 64))
+
+# Ingestion job queue (SQLite) behind /upload-file
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", os.path.join(DATA_DIR, "ingest_jobs.sqlite"))
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 2))
+INGEST_MAX_PENDING = int(os.environ.get("INGEST_MAX_PENDING", 20))
+INGEST_PER_COLLECTION = int(os.environ.get("INGEST_PER_COLLECTION", 1))
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+# A running job whose process stops renewing its lease for this long is requeued
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 60))
+
+# File and chunk fingerprints used for incremental re-ingestion
+DOCUMENT_REGISTRY_PATH = os.environ.get("DOCUMENT_REGISTRY_PATH", os.path.join(DATA_DIR, "document_registry.sqlite"))
+
+# Parallel PDF text extraction; the upload config key pdf_workers overrides the pool size
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", 8))
+
+# Topic extraction during ingestion; the upload config key extract_topics turns it off per upload
+TOPICS_ENABLED = os.environ.get("TOPICS_ENABLED", "true").lower() == "true"
+TOPIC_MODEL = os.environ.get("TOPIC_MODEL", "all-MiniLM-L6-v2")
+TOPICS_PER_CHUNK = int(os.environ.get("TOPICS_PER_CHUNK", 5))
+
+# MongoDB document listing
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "rag_db")
+MONGO_COLLECTION = os.environ.get("MONGO_COLLECTION", "documents")
+MONGO_POOL_SIZE = int(os.environ.get("MONGO_POOL_SIZE", 20))
+
+# Per-request trace spans, appended as OTLP/JSON lines; the response's trace_id finds them via /api/traces/<id>
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "true").lower() == "true"
+TRACE_PATH = os.environ.get("TRACE_PATH", os.path.join(DATA_DIR, "traces.jsonl"))
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "rag-agent-backend")
+# The trace file is rotated past TRACE_MAX_BYTES, keeping TRACE_BACKUPS old files
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", 64 * 1024 * 1024))
+TRACE_BACKUPS = int(os.environ.get("TRACE_BACKUPS", 3))
+# Recent traces kept in memory, so /api/traces/<id> does not have to scan the files
+TRACE_INDEX_SIZE = int(os.environ.get("TRACE_INDEX_SIZE", 1000))
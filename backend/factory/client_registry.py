@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+import httpx
+from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_milvus import Milvus
+from langchain_community.vectorstores import Chroma
+from backend.utils.embedding_cache import CachedEmbeddings, get_embedding_cache
+from backend.utils.event_loop import call_on_loop
+from backend.utils.http_client import MeteredTransport
+from backend.utils.tracing import tracing_callbacks
+from backend.config.default_config import (
+    EMBEDDING_MODEL,
+    CLIENT_POOL_SIZE,
+    CLIENT_POOL_TIMEOUT,
+    CLIENT_HEALTH_CHECK_SECONDS,
+)
+
+
+class ClientRegistry:
+    """Process-wide cache of embedding, LLM and vector store clients.
+
+    Clients are built once per key and reused by every request. All OpenAI
+    clients share one bounded HTTP connection pool. Lookups never await, so the
+    registry is safe to call from Flask threads and from coroutines alike.
+    """
+
+    def __init__(self, pool_size=CLIENT_POOL_SIZE, health_check_seconds=CLIENT_HEALTH_CHECK_SECONDS):
+        self.pool_size = pool_size
+        self.health_check_seconds = health_check_seconds
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._overrides = {}
+        self._http_client = None
+
+    @property
+    def http_client(self):
+        """Shared keep-alive connection pool used by all OpenAI clients."""
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                    self._http_client = httpx.Client(
+                        transport=MeteredTransport(httpx.HTTPTransport(limits=limits)),
+                        timeout=CLIENT_POOL_TIMEOUT,
+                    )
+        return self._http_client
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_create(self, key, factory, health_check=None):
+        """Return the client cached under key, building it with factory on first use.
+
+        When health_check is given it runs at most once per health check
+        interval; a client that fails it is dropped and rebuilt.
+        """
+        override = self._overrides.get(key[0])
+        if override is not None:
+            factory = lambda: override(*key[1:])
+        entry = self._clients.get(key)
+        if entry is not None:
+            client, checked_at = entry
+            if health_check is None or time.monotonic() - checked_at < self.health_check_seconds:
+                return client
+            try:
+                health_check(client)
+                self._clients[key] = (client, time.monotonic())
+                return client
+            except Exception as e:
+                print(f"Client {key} failed health check, reconnecting. Error: {e}")
+                self.evict(key)
+
+        # Build under a per-key lock so a slow Milvus handshake does not block other keys
+        with self._key_lock(key):
+            entry = self._clients.get(key)
+            if entry is not None:
+                return entry[0]
+            client = factory()
+            self._clients[key] = (client, time.monotonic())
+            return client
+
+    def override(self, kind: str, factory):
+        """Builds every client of this kind ("embeddings", "llm", "milvus", "chroma") with
+        factory(*key[1:]) instead, e.g. to run against local stand-ins. Drops cached clients.
+        """
+        self._overrides[kind] = factory
+        self.clear()
+
+    def evict(self, key):
+        self._clients.pop(key, None)
+
+    def clear(self):
+        self._clients.clear()
+
+
+def _check_milvus(vector_store):
+    vector_store.client.list_collections()
+
+
+def _check_chroma(vector_store):
+    vector_store._client.heartbeat()
+
+
+registry = ClientRegistry()
+
+
+def get_embeddings(model: str = EMBEDDING_MODEL):
+    """Returns the shared embedding client for the given model.
+
+    Vectors are served from the content-addressed embedding cache when the same
+    text was embedded before, so only new text reaches the OpenAI API.
+    """
+    return registry.get_or_create(
+        ("embeddings", model),
+        lambda: CachedEmbeddings(
+            OpenAIEmbeddings(model=model, http_client=registry.http_client),
+            model=model,
+            cache=get_embedding_cache(),
+        ),
+    )
+
+
+def get_llm(model_name: str = "gpt-4o", temperature: float = 0.0, max_tokens: int = None):
+    """Returns the shared chat model for the given model and sampling settings."""
+    return registry.get_or_create(
+        ("llm", model_name, temperature, max_tokens),
+        lambda: ChatOpenAI(
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            http_client=registry.http_client,
+            callbacks=[tracing_callbacks],
+        ),
+    )
+
+
+def get_vector_store(config: dict, model: str = EMBEDDING_MODEL):
+    """Returns the shared vector store for the vectordb/collection in config.
+
+    Raises ValueError for an unknown vectordb.
+    """
+    vectordb = config.get("vectordb", "milvus").lower()
+    collection_name = config.get("collection_name", "documents")
+
+    if vectordb == "milvus":
+        milvus_url = os.environ.get("MILVUS_URL")
+        milvus_token = os.environ.get("MILVUS_TOKEN")
+        return registry.get_or_create(
+            ("milvus", collection_name, model, milvus_url),
+            # Built on the shared loop, which its async client binds to
+            lambda: call_on_loop(lambda: Milvus(
+                embedding_function=get_embeddings(model),
+                collection_name=collection_name,
+                connection_args={"uri": milvus_url, "token": milvus_token},
+                text_field="text",  # Name of document attributes to holding text
+                vector_field="embedding"  # name of doc attribute to hold vector
+            )),
+            health_check=_check_milvus,
+        )
+    elif vectordb == "chroma":
+        persist_directory = config.get("persist_directory", "chroma_db")
+        return registry.get_or_create(
+            ("chroma", collection_name, model, persist_directory),
+            lambda: Chroma(
+                embedding_function=get_embeddings(model),
+                collection_name=collection_name,
+                persist_directory=persist_directory
+            ),
+            health_check=_check_chroma,
+        )
+    raise ValueError(f"Invalid vectordb '{vectordb}'. Valid options: ['milvus', 'chroma']")
@@ -0,0 +1,14 @@
+from langchain_community.document_loaders import TextLoader
+from backend.loaders import ParallelPDFLoader
+from backend.config.default_config import PDF_WORKERS, PDF_PAGES_PER_TASK
+
+
+def get_loader(filepath: str, config: dict):
+    """Builds the document loader for an uploaded file. PDFs are parsed on config["pdf_workers"] processes."""
+    if filepath.lower().endswith(".pdf"):
+        return ParallelPDFLoader(
+            filepath,
+            workers=int(config.get("pdf_workers", PDF_WORKERS)),
+            pages_per_task=int(config.get("pdf_pages_per_task", PDF_PAGES_PER_TASK)),
+        )
+    return TextLoader(filepath)
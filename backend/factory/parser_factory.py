@@ -1,12 +1,29 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter, CharacterTextSplitter
+from backend.parsers.simple_parser import TokenSplitter
+from backend.parsers.recursive_parser import RecursiveTokenSplitter
 
 def get_parser(config: dict):
-    """Builds a text splitter (parser) based on the config. Used for document ingestion."""
+    """Builds a text splitter (parser) based on the config. Used for document ingestion.
+
+    "token" and "recursive_token" count chunk_size and chunk_overlap in model
+    tokens (encoding_name, default cl100k_base); the others count characters.
+    """
     parser_type = config.get("parser_type", "recursive")
+
+    if parser_type in ("token", "recursive_token"):
+        chunk_size = int(config.get("chunk_size", 512))
+        chunk_overlap = int(config.get("chunk_overlap", 64))
+        splitter = TokenSplitter if parser_type == "token" else RecursiveTokenSplitter
+        return splitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            encoding_name=config.get("encoding_name", "cl100k_base"),
+        )
+
     chunk_size = int(config.get("chunk_size", 1000))
     chunk_overlap = int(config.get("chunk_overlap", 100))
 
     if parser_type == "simple":
         return CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     else:
-        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
\ No newline at end of file
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
@@ -1,20 +1,40 @@
-from langchain.retrievers import MultiQueryRetriever
-from langchain_openai import ChatOpenAI
+from backend.factory.client_registry import get_llm
+from backend.retrievers import HybridRetriever, MMRRetriever, MultiQueryRetriever, get_bm25_index
 
 def get_retriever(vector_store, config:dict):
     """Builds and returns vector store retriever based on configuration
     """
 
     retriever_type = config.get("retriever_type","vectorstore")
-    llm =ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0.0, max_tokens=1000)
 
     if retriever_type == "vectorstore":
         # Use the vector store directly
-        return vector_store.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+        return vector_store.as_retriever(search_type="similarity", search_kwargs={"k": int(config.get("k", 5))})
     
     elif retriever_type == "multi_query":
 
-        return MultiQueryRetriever.from_llm(
-            llm = llm,
-            retriever=vector_store.as_retriever()
+        return MultiQueryRetriever(
+            vector_store=vector_store,
+            llm=get_llm(model_name="gpt-3.5-turbo", temperature=0.0, max_tokens=1000),
+            k=int(config.get("k", 5)),
+            fetch_k=int(config.get("fetch_k", 20)),
+            num_queries=int(config.get("num_queries", 3)),
+        )
+
+    elif retriever_type == "hybrid":
+
+        return HybridRetriever(
+            vector_store=vector_store,
+            bm25_index=get_bm25_index(config),
+            k=int(config.get("k", 5)),
+            fetch_k=int(config.get("fetch_k", 20)),
+        )
+
+    elif retriever_type == "mmr":
+
+        return MMRRetriever(
+            vector_store=vector_store,
+            k=int(config.get("k", 5)),
+            fetch_k=int(config.get("fetch_k", 20)),
+            lambda_mult=float(config.get("lambda_mult", 0.5)),
         )
\ No newline at end of file
@@ -24,7 +24,8 @@ def build_agent_graph():
         {
             "rag": "rag",
             "web": "web",
-            "llm": "llm"
+            "llm": "llm",
+            "validator": "validator"
         }
     )     
     
@@ -35,8 +36,8 @@ def build_agent_graph():
 
     graph.add_conditional_edges(
         "validator",
-        # The lambda function checks the validation_result in the state
-        lambda state: "supervisor" if state.is_valid is False else END,
+        # Retry through the supervisor until the answer is valid or the budget is used up
+        lambda state: "supervisor" if state.is_valid is False and not state.budget_exhausted else END,
         {
             "supervisor": "supervisor",
             END: END
@@ -0,0 +1,3 @@
+from .parallel_pdf_loader import ParallelPDFLoader
+
+__all__ = ["ParallelPDFLoader"]
@@ -0,0 +1,67 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+
+def _extract_pages(path: str, start: int, stop: int):
+    """Runs in a worker process: returns (page_number, page_label, text) for pages [start, stop)."""
+    reader = PdfReader(path)
+    labels = reader.page_labels
+    return [(i, labels[i] if i < len(labels) else str(i + 1), reader.pages[i].extract_text())
+            for i in range(start, stop)]
+
+
+class ParallelPDFLoader(BaseLoader):
+    """PDF loader that extracts page ranges in a process pool and yields pages in order.
+
+    Text extraction in pypdf is pure Python and holds the GIL, so large PDFs are
+    split into ranges of pages_per_task pages that run on separate processes.
+    At most two ranges per worker are in flight, so memory stays bounded while
+    pages stream out in page order. Metadata matches PyPDFLoader: source, page
+    (0-based), page_label and total_pages.
+    """
+
+    def __init__(self, file_path: str, workers: int = 4, pages_per_task: int = 8):
+        self.file_path = file_path
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self._total_pages = None
+
+    def page_count(self) -> int:
+        """Number of pages in the file. Parses the page tree once; lazy_load reuses the count."""
+        if self._total_pages is None:
+            self._total_pages = len(PdfReader(self.file_path).pages)
+        return self._total_pages
+
+    def _documents(self, pages, total_pages):
+        for page, label, text in pages:
+            metadata = {"source": self.file_path, "page": page, "page_label": label, "total_pages": total_pages}
+            yield Document(page_content=text, metadata=metadata)
+
+    def lazy_load(self) -> Iterator[Document]:
+        total_pages = self.page_count()
+        ranges = [(start, min(start + self.pages_per_task, total_pages))
+                  for start in range(0, total_pages, self.pages_per_task)]
+        if self.workers == 1 or len(ranges) == 1:
+            for start, stop in ranges:
+                yield from self._documents(_extract_pages(self.file_path, start, stop), total_pages)
+            return
+
+        # spawn instead of fork: the server process runs threads (event loop, workers) that fork would copy
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(ranges)), mp_context=multiprocessing.get_context("spawn")
+        )
+        pending = deque()
+        try:
+            for start, stop in ranges:
+                pending.append(executor.submit(_extract_pages, self.file_path, start, stop))
+                if len(pending) >= self.workers * 2:
+                    yield from self._documents(pending.popleft().result(), total_pages)
+            while pending:
+                yield from self._documents(pending.popleft().result(), total_pages)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,157 @@
+"""Local nearest-centroid router for the supervisor.
+
+Retrain offline from the labelled examples plus confident LLM decisions that
+were logged in production:
+
+    python -m backend.local_router train [--examples PATH] [--log PATH] [--out PATH]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import numpy as np
+from backend.factory.client_registry import get_embeddings
+from backend.config.default_config import (
+    EMBEDDING_MODEL,
+    ROUTER_EXAMPLES_PATH,
+    ROUTER_MODEL_PATH,
+    ROUTER_LOG_PATH,
+    ROUTER_TEMPERATURE,
+)
+
+
+class LocalRouter:
+    """Routes a query embedding to the agent whose example centroid is closest."""
+
+    def __init__(self, centroids: dict, model: str = EMBEDDING_MODEL, temperature: float = ROUTER_TEMPERATURE):
+        self.routes = list(centroids)
+        self.model = model
+        self.temperature = temperature
+        matrix = np.asarray([centroids[route] for route in self.routes], dtype=np.float32)
+        self._centroids = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    @classmethod
+    def train(cls, examples, embeddings=None, model: str = EMBEDDING_MODEL):
+        """Builds a router from (query, route) pairs, embedding all queries in one batch."""
+        embeddings = embeddings or get_embeddings(model)
+        queries = [query for query, _ in examples]
+        vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        centroids = {}
+        for route in sorted({route for _, route in examples}):
+            rows = [i for i, (_, r) in enumerate(examples) if r == route]
+            centroids[route] = vectors[rows].mean(axis=0).tolist()
+        return cls(centroids, model=model)
+
+    def predict(self, embedding, exclude=()):
+        """Returns (route, confidence) where confidence is a softmax over centroid similarities.
+
+        Routes in exclude are left out of the softmax; (None, 0.0) when none remain.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarities = self._centroids @ query
+        if exclude:
+            similarities[[i for i, route in enumerate(self.routes) if route in exclude]] = -np.inf
+            if np.isneginf(similarities).all():
+                return None, 0.0
+        weights = np.exp((similarities - similarities.max()) / self.temperature)
+        probabilities = weights / weights.sum()
+        best = int(np.argmax(probabilities))
+        return self.routes[best], float(probabilities[best])
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        centroids = {route: row.tolist() for route, row in zip(self.routes, self._centroids)}
+        with open(path, "w") as f:
+            json.dump({"model": self.model, "temperature": self.temperature, "centroids": centroids}, f)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["centroids"], model=data["model"], temperature=data.get("temperature", ROUTER_TEMPERATURE))
+
+
+def load_examples(path: str):
+    with open(path) as f:
+        return [(entry["query"], entry["route"]) for entry in map(json.loads, f) if entry]
+
+
+_router = None
+_router_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def get_local_router():
+    """Returns the shared router, training it from the example file on first use if no model is saved.
+
+    Returns None when neither a saved model nor examples are available.
+    """
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                try:
+                    if os.path.exists(ROUTER_MODEL_PATH):
+                        _router = LocalRouter.load(ROUTER_MODEL_PATH)
+                    elif os.path.exists(ROUTER_EXAMPLES_PATH):
+                        _router = LocalRouter.train(load_examples(ROUTER_EXAMPLES_PATH))
+                        _router.save(ROUTER_MODEL_PATH)
+                except Exception as e:
+                    print(f"ERROR: Could not load the local router, using the LLM router only. Error: {e}")
+    return _router
+
+
+def log_routing_decision(query: str, route: str, source: str, local_route: str = None,
+                         confidence: float = None, feedback: str = None):
+    """Appends one routing decision to the JSONL log used for offline retraining."""
+    entry = {
+        "timestamp": time.time(),
+        "query": query,
+        "route": route,
+        "source": source,
+        "local_route": local_route,
+        "confidence": confidence,
+        "feedback": feedback,
+    }
+    print(f"--- ROUTER: {source} -> {route} (local: {local_route}, confidence: {confidence}) ---")
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(ROUTER_LOG_PATH) or ".", exist_ok=True)
+            with open(ROUTER_LOG_PATH, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"ERROR: Could not write routing log. Error: {e}")
+
+
+def _logged_llm_examples(path: str):
+    """LLM routing decisions from the log, usable as extra labelled examples.
+
+    Decisions made on a retry are left out: they were driven by the validator's
+    feedback, not by the query alone, which is all the local router sees.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [(entry["query"], entry["route"]) for entry in entries if entry.get("source") == "llm" and not entry.get("feedback")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("--examples", default=ROUTER_EXAMPLES_PATH)
+    parser.add_argument("--log", default=ROUTER_LOG_PATH, help="routing log; its LLM decisions are added as examples")
+    parser.add_argument("--out", default=ROUTER_MODEL_PATH)
+    args = parser.parse_args()
+
+    examples = load_examples(args.examples) + _logged_llm_examples(args.log)
+    router = LocalRouter.train(examples)
+    router.save(args.out)
+    print(f"Trained router on {len(examples)} examples for routes {router.routes}; saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,12 +27,22 @@ tools_list = [
             ]
 travel_planner = TravelPlanner(tools_list)
 
+
+class App(Flask):
+    """Flask app whose async views run on the shared event loop instead of a new loop per request"""
+
+    def async_to_sync(self, func):
+        from backend.utils.event_loop import run_async
+        return lambda *args, **kwargs: run_async(func(*args, **kwargs))
+
+
 def create_app():
     from backend.api.chat_routes import chat_bp
     from backend.api.document_routes import document_bp
     from backend.api.agent_routes import agent_bp
     from backend.api.travelsgent_routes import travel_agent_bp
-    app = Flask(__name__)
+    from backend.api.metrics_routes import metrics_bp
+    app = App(__name__)
     CORS(app, origins=['http://localhost:5173', 'http://127.0.0.1:5173'])
     
     
@@ -41,9 +51,26 @@ def create_app():
     app.register_blueprint(document_bp, url_prefix='/api')
     app.register_blueprint(agent_bp, url_prefix='/api')
     app.register_blueprint(travel_agent_bp, url_prefix='/api') 
+    app.register_blueprint(metrics_bp, url_prefix='/api')
     
     return app
 
+
+def start_background_services():
+    """Starts the exchange-rate refresher and the ingestion workers.
+
+    Call once from the process that serves requests, after the shared event loop
+    is settled: not from create_app, which also runs in the reloader's parent.
+    """
+    from backend.services.fx_service import fx_rates
+    from backend.services.job_queue import job_queue
+    fx_rates.start()
+    job_queue.start()
+
+
 if __name__ == '__main__':
     app = create_app()
+    # debug=True runs this module twice; only the reloader's child serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services()
     app.run(debug=True, port=5000)
\ No newline at end of file
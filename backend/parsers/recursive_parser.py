@@ -0,0 +1,81 @@
+from bisect import bisect_left
+from collections import deque
+from typing import List
+import numpy as np
+from backend.parsers.simple_parser import TokenSplitter
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+
+class RecursiveTokenSplitter(TokenSplitter):
+    """Token-budgeted version of the recursive character splitter.
+
+    A span longer than chunk_size tokens is cut at the first separator in the
+    hierarchy that occurs inside it, and pieces that are still too long are cut
+    with the next separator, down to plain token windows. The pieces are then
+    merged into chunks of at most chunk_size tokens, carrying up to
+    chunk_overlap tokens of trailing pieces into the next chunk. All sizes come
+    from the single tokenization of the text.
+    """
+
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 64, separators: List[str] = None, **kwargs):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._separators = separators or DEFAULT_SEPARATORS
+
+    def _cuts(self, text, bounds, start, stop, separator):
+        """Token indexes in (start, stop) where a piece ends at an occurrence of separator."""
+        positions = []
+        end_char = int(bounds[stop])
+        # Cut before the separator's whitespace, which BPE encodings put at the front of
+        # the next word's token (" word"); ". " still leaves the period with its sentence
+        offset = len(separator.rstrip())
+        position = text.find(separator, int(bounds[start]), end_char)
+        while position != -1:
+            positions.append(position + offset)
+            position = text.find(separator, position + len(separator), end_char)
+        if not positions:
+            return []
+        # Last token boundary at or before each cut position, so no token (or word) is split
+        cuts = np.unique(bounds.searchsorted(positions, side="right") - 1)
+        return cuts[(cuts > start) & (cuts < stop)].tolist()
+
+    def _split_span(self, text, bounds, start, stop, level):
+        if stop - start <= self._chunk_size:
+            return [(start, stop)]
+        for index in range(level, len(self._separators)):
+            separator = self._separators[index]
+            if not separator:
+                return [(i, min(i + self._chunk_size, stop)) for i in range(start, stop, self._chunk_size)]
+            cuts = self._cuts(text, bounds, start, stop, separator)
+            if cuts:
+                pieces = []
+                previous = start
+                for cut in cuts + [stop]:
+                    pieces.extend(self._split_span(text, bounds, previous, cut, index + 1))
+                    previous = cut
+                return pieces
+        return [(i, min(i + self._chunk_size, stop)) for i in range(start, stop, self._chunk_size)]
+
+    def _merge(self, pieces):
+        spans = []
+        current = deque()
+        total = 0
+        for start, stop in pieces:
+            size = stop - start
+            if current and total + size > self._chunk_size:
+                spans.append((current[0][0], current[-1][1]))
+                # Keep trailing pieces as overlap while they fit both the overlap and the next chunk
+                while current and (total > self._chunk_overlap or total + size > self._chunk_size):
+                    total -= current[0][1] - current[0][0]
+                    current.popleft()
+            current.append((start, stop))
+            total += size
+        if current:
+            spans.append((current[0][0], current[-1][1]))
+        return spans
+
+    def split_text(self, text: str) -> List[str]:
+        bounds = self.token_bounds(text)
+        pieces = self._split_span(text, bounds, 0, len(bounds) - 1, 0)
+        spans = self._merge(pieces)
+        return self._chunks(text, ((int(bounds[start]), int(bounds[stop])) for start, stop in spans))
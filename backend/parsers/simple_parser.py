@@ -0,0 +1,77 @@
+from typing import Iterable, Iterator, List
+import numpy as np
+import tiktoken
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+
+# Byte length of every token id, per encoding; built once so offsets are a vectorized cumulative sum
+_token_byte_lengths = {}
+
+
+def token_byte_lengths(encoding) -> np.ndarray:
+    lengths = _token_byte_lengths.get(encoding.name)
+    if lengths is None:
+        lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+        for token in range(encoding.n_vocab):
+            try:
+                lengths[token] = len(encoding.decode_single_token_bytes(token))
+            except KeyError:
+                pass
+        _token_byte_lengths[encoding.name] = lengths
+    return lengths
+
+
+class TokenSplitter(TextSplitter):
+    """Splits text into windows of chunk_size model tokens overlapping by chunk_overlap tokens.
+
+    Each text is tokenized once; chunk boundaries are token boundaries mapped
+    back to character offsets, so chunks are slices of the original string and
+    nothing is decoded or re-tokenized per chunk.
+    """
+
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 64, encoding_name: str = "cl100k_base",
+                 encoding=None, **kwargs):
+        # Windows advance by chunk_size - chunk_overlap tokens, which must be positive
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be at least 0 and smaller than chunk_size ({chunk_size})"
+            )
+        self._encoding = encoding or tiktoken.get_encoding(encoding_name)
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=self.count_tokens,
+                         **kwargs)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._encoding.encode_ordinary(text))
+
+    def token_bounds(self, text: str) -> np.ndarray:
+        """Character offset where each token starts, followed by len(text)."""
+        # disallowed_special=() encodes special-token text as ordinary text, like encode_ordinary
+        tokens = self._encoding.encode_to_numpy(text, disallowed_special=())
+        byte_bounds = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(token_byte_lengths(self._encoding)[tokens], out=byte_bounds[1:])
+        if text.isascii():
+            return byte_bounds
+        # Map byte offsets to character offsets; a token starting inside a character maps to that character
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        char_of_byte = np.append(np.cumsum((data & 0xC0) != 0x80) - 1, len(text))
+        return char_of_byte[byte_bounds]
+
+    def _chunks(self, text: str, char_spans) -> List[str]:
+        chunks = (text[start:stop] for start, stop in char_spans)
+        if self._strip_whitespace:
+            chunks = (chunk.strip() for chunk in chunks)
+        return [chunk for chunk in chunks if chunk]
+
+    def split_text(self, text: str) -> List[str]:
+        bounds = self.token_bounds(text)
+        total = len(bounds) - 1
+        starts = np.arange(0, max(total - self._chunk_overlap, 1), self._chunk_size - self._chunk_overlap)
+        stops = np.minimum(starts + self._chunk_size, total)
+        return self._chunks(text, zip(bounds[starts].tolist(), bounds[stops].tolist()))
+
+    def lazy_split_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Splits a stream of pages one at a time, yielding chunks that keep their page's metadata."""
+        for document in documents:
+            for chunk in self.split_text(document.page_content):
+                yield Document(page_content=chunk, metadata=dict(document.metadata))
@@ -1,12 +1,47 @@
+import asyncio
 from backend.tools.base_tools import TravelTool
 from backend.state_schema.travel_planner_schema import TravelPlannerState
 
 class TravelPlanner:
     def __init__(self,tools: list[TravelTool]):
         self.tools = tools
+        self.dependencies = self._build_dependencies(tools)
+
+    @staticmethod
+    def _build_dependencies(tools: list[TravelTool]) -> list[set[int]]:
+        """For every tool, the indexes of earlier tools it has to wait for.
+
+        A tool waits for an earlier one when it reads a field the earlier tool
+        writes, writes a field the earlier tool reads, or both write the same field.
+        """
+        dependencies = []
+        for i, tool in enumerate(tools):
+            reads, writes = set(tool.reads), set(tool.writes)
+            dependencies.append({
+                j for j, earlier in enumerate(tools[:i])
+                if reads & set(earlier.writes) or writes & set(earlier.reads) or writes & set(earlier.writes)
+            })
+        return dependencies
 
     async def plan(self, state:TravelPlannerState) -> TravelPlannerState:
-        """Executes the travel planning process using the provided tools."""
-        for tool in self.tools:
-            state = await tool.execute(state)
-        return state
\ No newline at end of file
+        """Executes the travel planning process using the provided tools.
+
+        Tools run concurrently as soon as the tools they depend on have finished,
+        so the total latency is that of the slowest dependency chain.
+        """
+        tasks = []
+
+        async def run_tool(tool, dependencies):
+            if dependencies:
+                await asyncio.gather(*(tasks[j] for j in dependencies))
+            await tool.run(state)
+
+        for tool, dependencies in zip(self.tools, self.dependencies):
+            tasks.append(asyncio.create_task(run_tool(tool, dependencies)))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return state
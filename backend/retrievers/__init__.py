@@ -0,0 +1,6 @@
+from .bm25_index import BM25Index, get_bm25_index
+from .hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from .mmr_retriever import MMRRetriever, mmr_select
+from .multi_query_retriever import MultiQueryRetriever
+
+__all__ = ['BM25Index', 'get_bm25_index', 'HybridRetriever', 'reciprocal_rank_fusion', 'MMRRetriever', 'mmr_select', 'MultiQueryRetriever']
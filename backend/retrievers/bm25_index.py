@@ -0,0 +1,222 @@
+import fcntl
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from langchain_core.documents import Document
+from backend.utils.helpers import document_key
+from backend.config.default_config import BM25_INDEX_DIR
+
+# Keeps identifiers such as "c#", "system.linq" and "cs0246" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9_][a-z0-9_#+.]*")
+
+
+def tokenize(text: str) -> list:
+    return [token.rstrip(".") for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class BM25Index:
+    """Incrementally updated in-memory BM25 inverted index.
+
+    When a path is given, every change is appended to a JSONL log at that path
+    and replayed on startup, so the index survives restarts without a rebuild.
+    The log is compacted to one entry per live chunk when it is loaded. Other
+    processes sharing the log (e.g. several server workers) pick up each other's
+    changes: every operation first replays whatever was appended since it last
+    looked, and reloads the whole log when another process compacted it.
+    """
+
+    def __init__(self, path: str = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._docs = {}
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._total_length = 0
+        self._lock = threading.RLock()
+        # Identity and length of the log prefix already applied to this index
+        self._log_inode = None
+        self._log_offset = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.compact()
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._docs)
+
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using the same log."""
+        return _FileLock(self.path + ".lock")
+
+    def _reset(self):
+        self._docs = {}
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._total_length = 0
+        self._log_offset = 0
+
+    def _sync(self):
+        """Applies log entries written since the last call, by this or another process."""
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._log_inode:
+            # First load, or the log was compacted (replaced) elsewhere
+            self._reset()
+            self._log_inode = stat.st_ino
+        if stat.st_size <= self._log_offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Leave a partially written last line for the next call
+        complete = data.rfind(b"\n") + 1
+        for line in data[:complete].decode("utf-8").splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._log_offset += complete
+
+    def _apply(self, entry):
+        if entry["op"] == "add":
+            doc = Document(page_content=entry["text"], metadata=entry["metadata"])
+            self._add(entry["id"], doc)
+        elif entry["op"] == "delete":
+            for doc_id in entry["ids"]:
+                self._remove(doc_id)
+
+    def _append_log(self, entries):
+        if not self.path:
+            return
+        data = "".join(json.dumps(entry, default=str) + "\n" for entry in entries).encode("utf-8")
+        with self._file_lock():
+            # Catch up first, so our offset stays exact after the write
+            self._sync()
+            with open(self.path, "ab") as f:
+                f.write(data)
+            stat = os.stat(self.path)
+            self._log_inode = stat.st_ino
+            self._log_offset = stat.st_size
+
+    def compact(self):
+        """Rewrites the log as one add per indexed chunk, dropping replaced and deleted entries."""
+        if not self.path:
+            return
+        with self._lock, self._file_lock():
+            self._sync()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for doc_id, doc in self._docs.items():
+                    entry = {"op": "add", "id": doc_id, "text": doc.page_content, "metadata": doc.metadata}
+                    f.write(json.dumps(entry, default=str) + "\n")
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._log_inode = stat.st_ino
+            self._log_offset = stat.st_size
+
+    def _add(self, doc_id, doc):
+        self._remove(doc_id)
+        term_counts = Counter(tokenize(doc.page_content))
+        for term, count in term_counts.items():
+            self._postings[term][doc_id] = count
+        length = sum(term_counts.values())
+        self._docs[doc_id] = doc
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in set(tokenize(doc.page_content)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add_documents(self, documents, ids=None):
+        """Indexes documents, replacing any previously indexed under the same ids."""
+        ids = ids or [document_key(doc) for doc in documents]
+        with self._lock:
+            self._sync()
+            for doc_id, doc in zip(ids, documents):
+                self._add(doc_id, doc)
+            self._append_log(
+                {"op": "add", "id": doc_id, "text": doc.page_content, "metadata": doc.metadata}
+                for doc_id, doc in zip(ids, documents)
+            )
+        return ids
+
+    def delete(self, ids):
+        with self._lock:
+            self._sync()
+            for doc_id in ids:
+                self._remove(doc_id)
+            self._append_log([{"op": "delete", "ids": list(ids)}])
+
+    def search(self, query: str, k: int = 5):
+        """Returns the k best (Document, score) pairs for the query."""
+        terms = set(tokenize(query))
+        with self._lock:
+            self._sync()
+            n_docs = len(self._docs)
+            if not n_docs or not terms:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self._docs[doc_id], score) for doc_id, score in best]
+
+
+class _FileLock:
+    __slots__ = ("path", "_fd")
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        return False
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_bm25_index(config: dict) -> BM25Index:
+    """Returns the process-wide keyword index for the vectordb/collection in config."""
+    vectordb = config.get("vectordb", "milvus").lower()
+    collection_name = config.get("collection_name", "documents")
+    key = (vectordb, collection_name)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            path = os.path.join(BM25_INDEX_DIR, f"{vectordb}__{collection_name}.jsonl")
+            index = BM25Index(path)
+            _indexes[key] = index
+        return index
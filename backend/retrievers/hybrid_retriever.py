@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from backend.utils.helpers import document_key
+from backend.config.default_config import RRF_K
+
+# Runs the vector half of a hybrid search while the calling thread scores BM25
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def reciprocal_rank_fusion(result_lists, k: int, rrf_k: int = RRF_K):
+    """Merges ranked Document lists into the k best (Document, fused score) pairs.
+
+    Each list contributes 1 / (rrf_k + rank) for every document it contains, so
+    documents ranked well by several searches come out on top.
+    """
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = document_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(docs[key], score) for key, score in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """Keyword (BM25) plus vector retriever, merged with reciprocal-rank fusion."""
+
+    vector_store: VectorStore
+    bm25_index: Any
+    k: int = 5
+    fetch_k: int = 20
+    rrf_k: int = RRF_K
+
+    def search_with_scores(self, query: str):
+        """Runs both searches concurrently and returns fused (Document, score) pairs."""
+        vector_future = _executor.submit(self.vector_store.similarity_search, query, self.fetch_k)
+        keyword_results = [doc for doc, _ in self.bm25_index.search(query, self.fetch_k)]
+        vector_results = vector_future.result()
+        return reciprocal_rank_fusion([vector_results, keyword_results], self.k, self.rrf_k)
+
+    async def asearch_with_scores(self, query: str):
+        vector_results, keyword_results = await asyncio.gather(
+            asyncio.to_thread(self.vector_store.similarity_search, query, self.fetch_k),
+            asyncio.to_thread(self.bm25_index.search, query, self.fetch_k),
+        )
+        keyword_results = [doc for doc, _ in keyword_results]
+        return reciprocal_rank_fusion([vector_results, keyword_results], self.k, self.rrf_k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in self.search_with_scores(query)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in await self.asearch_with_scores(query)]
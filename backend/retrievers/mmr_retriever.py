@@ -0,0 +1,115 @@
+from typing import List
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from langchain_milvus import Milvus
+from langchain_community.vectorstores import Chroma
+
+
+def mmr_select(query_vector, candidate_vectors, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """Greedy maximal marginal relevance over candidate vectors, vectorized with NumPy.
+
+    Returns the indexes of the selected candidates in selection order. Each step
+    scores all remaining candidates at once; the similarity of every candidate
+    to the already selected set is kept as a running maximum, so a step costs
+    one matrix-vector product instead of a full pairwise similarity matrix.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if candidates.ndim != 2 or len(candidates) == 0 or k <= 0:
+        return []
+    k = min(k, len(candidates))
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms
+    query = np.asarray(query_vector, dtype=np.float32)
+    query_norm = np.linalg.norm(query)
+    if query_norm:
+        query = query / query_norm
+
+    relevance = candidates @ query
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity = candidates @ candidates[first]
+    for _ in range(1, k):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(max_similarity, candidates @ candidates[best], out=max_similarity)
+    return selected
+
+
+def fetch_candidates(vector_store: VectorStore, embedding, fetch_k: int):
+    """Fetches fetch_k nearest documents together with their stored vectors in one call.
+
+    Returns (documents, vectors). Milvus and Chroma return the vectors alongside
+    the search hits; other stores fall back to re-embedding the hits, which the
+    embedding cache usually answers from memory.
+    """
+    if isinstance(vector_store, Milvus):
+        # Ask the search itself to return the vector field
+        if vector_store.col is None:
+            return [], []
+        search_params = vector_store.search_params
+        if isinstance(search_params, list):
+            search_params = search_params[0]
+        vector_field = vector_store._vector_field
+        results = vector_store.client.search(
+            vector_store.collection_name,
+            data=[embedding],
+            anns_field=vector_field,
+            search_params=search_params,
+            limit=fetch_k,
+            output_fields=vector_store._get_output_fields() + [vector_field],
+        )
+        documents, vectors = [], []
+        for hit in results[0] if results else []:
+            entity = dict(hit["entity"])
+            vectors.append(entity.pop(vector_field))
+            documents.append(vector_store._parse_document(entity))
+        return documents, vectors
+
+    if isinstance(vector_store, Chroma):
+        results = vector_store._collection.query(
+            query_embeddings=[embedding],
+            n_results=fetch_k,
+            include=["documents", "metadatas", "embeddings"],
+        )
+        documents = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(results["documents"][0], results["metadatas"][0])
+        ]
+        return documents, list(results["embeddings"][0])
+
+    documents = vector_store.similarity_search_by_vector(embedding, k=fetch_k)
+    vectors = vector_store.embeddings.embed_documents([doc.page_content for doc in documents])
+    return documents, vectors
+
+
+class MMRRetriever(BaseRetriever):
+    """Retriever that reranks fetch_k vector hits down to k diverse results with MMR."""
+
+    vector_store: VectorStore
+    k: int = 5
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+
+    def search_with_scores(self, query: str):
+        """Returns up to k (Document, cosine relevance) pairs in MMR order."""
+        embedding = self.vector_store.embeddings.embed_query(query)
+        documents, vectors = fetch_candidates(self.vector_store, embedding, self.fetch_k)
+        if not documents:
+            return []
+        vectors = np.asarray(vectors, dtype=np.float32)
+        selected = mmr_select(embedding, vectors, self.k, self.lambda_mult)
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors[selected], axis=1) * (np.linalg.norm(query) or 1.0)
+        norms[norms == 0] = 1.0
+        relevance = (vectors[selected] @ query) / norms
+        return [(documents[i], float(score)) for i, score in zip(selected, relevance)]
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in self.search_with_scores(query)]
@@ -0,0 +1,104 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from backend.config.default_config import RRF_K
+from backend.retrievers.hybrid_retriever import reciprocal_rank_fusion
+from backend.utils.singleflight import normalize
+from backend.utils.tracing import annotate
+
+# Runs the per-query vector searches of a multi-query retrieval
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="multi-query-search")
+
+MULTI_QUERY_PROMPT = PromptTemplate(
+    input_variables=["question", "num_queries"],
+    template=(
+        "You are an AI language model assistant. Your task is to generate {num_queries} "
+        "different versions of the given user question to retrieve relevant documents from a vector "
+        "database. By generating multiple perspectives on the user question, your goal is to help "
+        "the user overcome some of the limitations of distance-based similarity search.\n"
+        "Provide these alternative questions separated by newlines, without numbering.\n"
+        "Original question: {question}"
+    )
+)
+
+
+# List markers the LLM sometimes puts in front of its rewrites despite the prompt
+_LIST_MARKER = re.compile(r"^(?:[-*\u2022]|\d+[.)])\s+")
+
+
+def parse_queries(text: str, question: str, num_queries: int) -> List[str]:
+    """The original question followed by up to num_queries distinct rewrites from the LLM output."""
+    queries = [question]
+    seen = {normalize(question)}
+    for line in text.splitlines():
+        line = _LIST_MARKER.sub("", line.strip())
+        if line and normalize(line) not in seen:
+            seen.add(normalize(line))
+            queries.append(line)
+        if len(queries) > num_queries:
+            break
+    return queries
+
+
+class MultiQueryRetriever(BaseRetriever):
+    """Retriever that searches with LLM-generated rewrites of the query and fuses the results.
+
+    The original query is searched while the LLM writes the rewrites; the
+    rewrites are then embedded in one batch and searched concurrently, and all
+    result lists are merged by chunk text with reciprocal-rank fusion.
+    """
+
+    vector_store: VectorStore
+    llm: Any
+    k: int = 5
+    fetch_k: int = 20
+    num_queries: int = 3
+    rrf_k: int = RRF_K
+
+    def _search(self, embedding):
+        return self.vector_store.similarity_search_by_vector(embedding, k=self.fetch_k)
+
+    def _prompt(self, query: str) -> str:
+        return MULTI_QUERY_PROMPT.format(question=query, num_queries=self.num_queries)
+
+    def search_with_scores(self, query: str):
+        """Returns up to k fused (Document, score) pairs."""
+        embeddings = self.vector_store.embeddings
+        original = _executor.submit(lambda: self._search(embeddings.embed_query(query)))
+        response = self.llm.invoke(self._prompt(query))
+        rewrites = parse_queries(getattr(response, "content", str(response)), query, self.num_queries)[1:]
+        annotate(sub_queries=len(rewrites))
+
+        vectors = embeddings.embed_documents(rewrites) if rewrites else []
+        result_lists = [original.result()] + list(_executor.map(self._search, vectors))
+        return reciprocal_rank_fusion(result_lists, self.k, self.rrf_k)
+
+    async def asearch_with_scores(self, query: str):
+        embeddings = self.vector_store.embeddings
+
+        async def search_original():
+            return await asyncio.to_thread(self._search, await embeddings.aembed_query(query))
+
+        original = asyncio.create_task(search_original())
+        try:
+            response = await self.llm.ainvoke(self._prompt(query))
+        except BaseException:
+            original.cancel()
+            raise
+        rewrites = parse_queries(getattr(response, "content", str(response)), query, self.num_queries)[1:]
+        annotate(sub_queries=len(rewrites))
+
+        vectors = await embeddings.aembed_documents(rewrites) if rewrites else []
+        result_lists = await asyncio.gather(original, *(asyncio.to_thread(self._search, v) for v in vectors))
+        return reciprocal_rank_fusion(result_lists, self.k, self.rrf_k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in self.search_with_scores(query)]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return [doc for doc, _ in await self.asearch_with_scores(query)]
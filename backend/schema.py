@@ -24,5 +24,18 @@ class AgentState(BaseModel):
     is_valid: Optional[bool] = Field(default=None, description="Result from the validation agent")
     answer_source: Optional[str] = Field(default=None, description="The agent that was the source for the answer")
     sources: List[Dict[str, Any]] = Field(default_factory=list, description="List of source documents retrieved by agents")
+    error: Optional[str] = Field(default=None, description="Error raised by an agent, if any")
+
+    # Budget of the supervisor -> validator loop
+    iterations: int = Field(default=0, description="Number of supervisor passes so far")
+    max_iterations: Optional[int] = Field(default=None, description="Maximum number of supervisor passes")
+    deadline: Optional[float] = Field(default=None, description="Wall-clock time (epoch seconds) after which the run stops")
+    token_budget: Optional[int] = Field(default=None, description="Maximum LLM tokens for the run, 0 for unlimited")
+    tokens_used: int = Field(default=0, description="LLM tokens used so far")
+    budget_exhausted: bool = Field(default=False, description="Set when the run stopped because the budget ran out")
+    best_answer: Optional[str] = Field(default=None, description="Highest scoring candidate answer so far")
+    best_score: float = Field(default=-1.0, description="Validator score of the best answer")
+    best_answer_source: Optional[str] = Field(default=None, description="Agent that produced the best answer")
+    best_sources: List[Dict[str, Any]] = Field(default_factory=list, description="Sources of the best answer")
     # Final output
     final_answer: Optional[str] = Field(default=None, description="Final answer after validation and feedback")
\ No newline at end of file
@@ -1,130 +1,169 @@
 import time  # Import the time module directly, not from datetime
 import os
-import threading
-import asyncio
 from langchain.chains import LLMChain
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import RetrievalQA
-from langchain_milvus import Milvus
+from backend.factory.client_registry import get_embeddings, get_llm, get_vector_store
+from backend.services.semantic_cache import collection_key, semantic_cache
+from backend.retrievers import HybridRetriever, MMRRetriever, get_bm25_index
 
 
 from backend.utils.enums import SearchType
-def patch_thread_with_event_loop():
-    """Patch Thread class to ensure every thread has an event loop"""
-    original_thread_init = threading.Thread.__init__
-    
-    def new_thread_init(self, *args, **kwargs):
-        original_thread_init(self, *args, **kwargs)
-        original_run = self.run
-        
-        def patched_run(*args, **kwargs):
-            try:
-                asyncio.get_event_loop()
-            except RuntimeError:
-                # Thread has no event loop, create one
-                asyncio.set_event_loop(asyncio.new_event_loop())
-            return original_run(*args, **kwargs)
-            
-        self.run = patched_run
-        
-    threading.Thread.__init__ = new_thread_init
-
-# Apply the patch
-patch_thread_with_event_loop()
+from backend.utils.metrics import RETRIEVER_ERRORS, RETRIEVER_LATENCY, track
+from backend.utils.singleflight import SingleFlight, normalize
+from backend.utils.tracing import annotate, span
+
+# Collection the chat endpoint answers from
+CHAT_STORE_CONFIG = {"vectordb": "milvus", "collection_name": "documents"}
+
+# Identical questions asked while one is being answered wait for that answer
+chat_flight = SingleFlight("chat")
+
+
 def process_message(message,search_type_str="knnBeta"):
-    """Process a chat message using RAG pipeline"""
+    """Process a chat message, answering near-duplicate questions from the semantic cache"""
+    return chat_flight.do((normalize(message), search_type_str), _process_message, message, search_type_str)
+
+
+def _process_message(message, search_type_str):
+    try:
+        # The embedding cache keeps this vector, so the search below does not embed the message again
+        embedding = get_embeddings().embed_query(message)
+        namespace = f"chat:{search_type_str}"
+        cached = semantic_cache.lookup(namespace, embedding)
+        annotate(semantic_cache_hit=cached is not None)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        result = _answer_message(message, search_type_str)
+        if isinstance(result, dict) and result.get("sources"):
+            semantic_cache.store(namespace, collection_key(CHAT_STORE_CONFIG), message, embedding, result)
+        return result
+    except Exception as e:
+        print(f"Error in process_message: {e}")
+        return f"I encountered an error processing your request: {str(e)}"
+
+
+# Enhanced prompt template to encourage comprehensive answers
+CHAT_PROMPT = PromptTemplate(
+    input_variables=["context", "question"],
+    template=(
+        "Use the following pieces of context to answer the question at the end.\n"
+        "Be comprehensive, detailed and thorough in your response.\n"
+        "Don't truncate or abbreviate your answer.\n"
+        "Explain concepts fully when they're relevant to the question.\n\n"
+        "{context}\n\n"
+        "Question: {question}\n"
+        "Comprehensive answer:"
+    )
+)
+
+NO_DOCUMENTS_RESULT = {
+    "answer": "No relevant documents found.",
+    "sources": [],
+    "similarity_scores": [],
+    "search_time_seconds": 0,
+    "total_sources": 0
+}
+
+
+def _chat_llm():
+    return get_llm(
+        model_name="gpt-3.5-turbo",
+        temperature=0.5,  # Slightly higher temperature for more detailed outputs
+        max_tokens=2000   # Increase the token limit for longer responses
+    )
+
+
+def _resolve_search_type(search_type_str):
+    """Accept both the enum value ("knnBeta") and its name ("KNN_BETA"); raises ValueError otherwise."""
     try:
-        # Load the vector store if it exists
+        return SearchType(search_type_str).value
+    except ValueError:
         try:
-            search_type = SearchType[search_type_str.upper()].value
+            return SearchType[search_type_str.upper()].value
         except KeyError:
-            return {
-                "error": f"Invalid search_type '{search_type_str}'. Valid options: {[e.value for e in SearchType]}"
-            }
-        milvus_url = os.environ.get("MILVUS_URL")
-        milvus_token = os.environ.get("MILVUS_TOKEN")
-        collection_name = "documents"
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small", client=None)
-        search_kwargs = {"k": 5}
-        
-        # Initialize a Milvus-backed vector store for retrieval-augmented generation
-        vectorstore = Milvus(
-            embedding_function=embeddings,
-            collection_name=collection_name,
-            connection_args={"uri": milvus_url, "token": milvus_token},
-            text_field="text", # Name of document attributes to holding text
-            vector_field="embedding" # name of doc attribute to gold vector 
-        )
-
-        docs_and_scores = vectorstore.similarity_search_with_score(message, k=5,fetch_k=15,lambda_mult=0.7)
-        scores = [float(score) for _, score in docs_and_scores]
-        if not docs_and_scores:
-            return {
-            "answer": "No relevant documents found.",
-            "sources": [],
-            "similarity_scores": [],
-            "search_time_seconds": 0,
-            "total_sources": 0
+            raise ValueError(
+                f"Invalid search_type '{search_type_str}'. Valid options: {[e.value for e in SearchType]}"
+            )
+
+
+def _retrieve(message, search_type, k=5):
+    """Returns the (Document, score) pairs for the message using the requested search type"""
+    with track(RETRIEVER_LATENCY, search_type, errors=RETRIEVER_ERRORS), span("retrieve", retriever=search_type):
+        results = _search(message, search_type, k)
+        annotate(chunks=len(results))
+        return results
+
+
+def _search(message, search_type, k):
+    store_config = CHAT_STORE_CONFIG
+
+    # Keyword search alone never touches Milvus
+    if search_type == SearchType.BM25.value:
+        return get_bm25_index(store_config).search(message, k=k)
+
+    # Shared Milvus-backed vector store for retrieval-augmented generation
+    vectorstore = get_vector_store(store_config)
+    if search_type == SearchType.HYBRID.value:
+        hybrid = HybridRetriever(vector_store=vectorstore, bm25_index=get_bm25_index(store_config), k=k)
+        return hybrid.search_with_scores(message)
+    if search_type == SearchType.MMR.value:
+        mmr = MMRRetriever(vector_store=vectorstore, k=k, fetch_k=15, lambda_mult=0.7)
+        return mmr.search_with_scores(message)
+    return vectorstore.similarity_search_with_score(message, k=k)
+
+
+def _build_sources(docs_and_scores):
+    sources = []
+    for doc, _ in docs_and_scores:
+        source_info = {
+            "source_name": doc.metadata.get("source", "Unknown"),
+            "page_content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
+            "metadata": {
+                "date_processed": doc.metadata.get("date_processed"),
+                "chunk_index": doc.metadata.get("chunk_index"),
+                "score": doc.metadata.get("score"),
+                "page": doc.metadata.get("page"),
+                "file_name": doc.metadata.get("file_name"),
             }
+        }
+        sources.append(source_info)
+    return sources
 
-    
-        context = "\n\n".join(doc.page_content for doc, _ in docs_and_scores)
-        scores  = [float(score) for _, score in docs_and_scores]
-        # Create retrieval chain with improved parameters for fuller responses
-        llm = ChatOpenAI(
-            model_name="gpt-3.5-turbo",
-            temperature=0.5,  # Slightly higher temperature for more detailed outputs
-            max_tokens=2000   # Increase the token limit for longer responses
-        )
-        max_score = max(scores) if scores else 1.0
-        accuracy_percentages = [round((s / max_score) * 100, 2) for s in scores]
-
-        # Enhanced prompt template to encourage comprehensive answers
-        stuff_prompt = PromptTemplate(
-            input_variables=["context", "question"],
-            template=(
-                "Use the following pieces of context to answer the question at the end.\n"
-                "Be comprehensive, detailed and thorough in your response.\n"
-                "Don't truncate or abbreviate your answer.\n"
-                "Explain concepts fully when they're relevant to the question.\n\n"
-                "{context}\n\n"
-                "Question: {question}\n"
-                "Comprehensive answer:"
-            )
-        )
 
-        # 3) call your prompt/LLM
+def _accuracy_percentages(scores):
+    max_score = max(scores) if scores else 1.0
+    return [round((s / max_score) * 100, 2) for s in scores]
+
+
+def _answer_message(message, search_type_str):
+    """Process a chat message using RAG pipeline"""
+    try:
+        try:
+            search_type = _resolve_search_type(search_type_str)
+        except ValueError as e:
+            return {"error": str(e)}
 
+        docs_and_scores = _retrieve(message, search_type)
+        if not docs_and_scores:
+            return dict(NO_DOCUMENTS_RESULT)
 
-        llm_chain = LLMChain(llm=llm, prompt=stuff_prompt)
+        context = "\n\n".join(doc.page_content for doc, _ in docs_and_scores)
+        scores = [float(score) for _, score in docs_and_scores]
 
+        llm_chain = LLMChain(llm=_chat_llm(), prompt=CHAT_PROMPT)
 
         # Execute query
         start_time = time.time()
         answer = llm_chain.run({"context": context, "question": message})
         elapsed_time = time.time() - start_time
-        # use the docs we already retrieved
-        source_docs = [doc for doc, _ in docs_and_scores]
-        sources = []
-        for doc in source_docs:
-            source_info = {
-                "source_name": doc.metadata.get("source", "Unknown"),
-                "page_content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                "metadata": {
-                    "date_processed": doc.metadata.get("date_processed"),
-                    "chunk_index": doc.metadata.get("chunk_index"),
-                    "score": doc.metadata.get("score"),
-                    "page": doc.metadata.get("page"),
-                    "file_name": doc.metadata.get("file_name"),
-                }
-            }
-            sources.append(source_info)
+        sources = _build_sources(docs_and_scores)
         return {
             "answer": answer,
             "sources": sources,
             "similarity_scores": scores,
-            "accuracy_percentages": accuracy_percentages, 
+            "accuracy_percentages": _accuracy_percentages(scores),
             "search_time_seconds": elapsed_time,
             "total_sources": len(sources),
             "search_type_used": search_type
@@ -132,4 +171,59 @@ def process_message(message,search_type_str="knnBeta"):
     
     except Exception as e:
         print(f"Error in process_message: {e}")
-        return f"I encountered an error processing your request: {str(e)}"
\ No newline at end of file
+        return f"I encountered an error processing your request: {str(e)}"
+
+
+def stream_message(message, search_type_str="knnBeta"):
+    """Streaming variant of process_message.
+
+    Yields (event, data) pairs: "retrieval" once the sources are known, a
+    "token" per answer delta, then "done" with the same payload process_message
+    returns, or a single "error".
+    """
+    try:
+        embedding = get_embeddings().embed_query(message)
+        namespace = f"chat:{search_type_str}"
+        cached = semantic_cache.lookup(namespace, embedding)
+        if cached is not None:
+            yield "done", {**cached, "cached": True}
+            return
+
+        try:
+            search_type = _resolve_search_type(search_type_str)
+        except ValueError as e:
+            yield "error", {"error": str(e)}
+            return
+
+        docs_and_scores = _retrieve(message, search_type)
+        if not docs_and_scores:
+            yield "done", dict(NO_DOCUMENTS_RESULT)
+            return
+
+        scores = [float(score) for _, score in docs_and_scores]
+        sources = _build_sources(docs_and_scores)
+        yield "retrieval", {"sources": sources, "similarity_scores": scores, "search_type_used": search_type}
+
+        context = "\n\n".join(doc.page_content for doc, _ in docs_and_scores)
+        prompt = CHAT_PROMPT.format(context=context, question=message)
+        start_time = time.time()
+        parts = []
+        for chunk in _chat_llm().stream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield "token", {"delta": chunk.content}
+
+        result = {
+            "answer": "".join(parts),
+            "sources": sources,
+            "similarity_scores": scores,
+            "accuracy_percentages": _accuracy_percentages(scores),
+            "search_time_seconds": time.time() - start_time,
+            "total_sources": len(sources),
+            "search_type_used": search_type
+        }
+        semantic_cache.store(namespace, collection_key(CHAT_STORE_CONFIG), message, embedding, result)
+        yield "done", result
+    except Exception as e:
+        print(f"Error in stream_message: {e}")
+        yield "error", {"error": f"I encountered an error processing your request: {str(e)}"}
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from backend.config.default_config import DOCUMENT_REGISTRY_PATH
+
+
+def file_fingerprint(path: str) -> str:
+    """sha256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_fingerprint(source: str, text: str, occurrence: int = 0) -> str:
+    """Id of a chunk: its source, content and how many identical chunks precede it in the source."""
+    return hashlib.sha256(f"{source}\0{occurrence}\0{text}".encode("utf-8")).hexdigest()
+
+
+class DocumentRegistry:
+    """Which chunks of which source document are stored in each collection.
+
+    Collections are keyed "vectordb/collection". The file fingerprint is only
+    recorded once a document was fully ingested; chunk ids are recorded as their
+    batches are upserted, so an interrupted upload resumes instead of duplicating.
+    Topics extracted at ingestion are kept per chunk, so removing chunks also
+    updates the collection's topic summary. Each collection also has a
+    generation, bumped whenever its content changes, which lets every process
+    tell whether an answer cached before that is still current.
+    """
+
+    def __init__(self, path: str = DOCUMENT_REGISTRY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "collection TEXT NOT NULL, source TEXT NOT NULL, fingerprint TEXT, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (collection, source))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "collection TEXT NOT NULL, source TEXT NOT NULL, chunk_id TEXT NOT NULL, "
+                "PRIMARY KEY (collection, source, chunk_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_topics ("
+                "collection TEXT NOT NULL, source TEXT NOT NULL, chunk_id TEXT NOT NULL, topic TEXT NOT NULL, "
+                "PRIMARY KEY (collection, source, chunk_id, topic))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS chunk_topics_topic ON chunk_topics (collection, topic)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS generations (collection TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def fingerprint(self, collection: str, source: str):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT fingerprint FROM documents WHERE collection = ? AND source = ?", (collection, source)
+            ).fetchone()
+        return row[0] if row else None
+
+    def chunk_ids(self, collection: str, source: str) -> set:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT chunk_id FROM chunks WHERE collection = ? AND source = ?", (collection, source)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def add_chunks(self, collection: str, source: str, chunk_ids):
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR IGNORE INTO chunks (collection, source, chunk_id) VALUES (?, ?, ?)",
+                [(collection, source, chunk_id) for chunk_id in chunk_ids],
+            )
+            db.commit()
+
+    def remove_chunks(self, collection: str, source: str, chunk_ids):
+        rows = [(collection, source, chunk_id) for chunk_id in chunk_ids]
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM chunks WHERE collection = ? AND source = ? AND chunk_id = ?", rows)
+            db.executemany("DELETE FROM chunk_topics WHERE collection = ? AND source = ? AND chunk_id = ?", rows)
+            db.commit()
+
+    def add_topics(self, collection: str, source: str, topics_by_chunk: dict):
+        """Records the topics extracted for each chunk id."""
+        rows = [
+            (collection, source, chunk_id, topic)
+            for chunk_id, topics in topics_by_chunk.items()
+            for topic in topics
+        ]
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR IGNORE INTO chunk_topics (collection, source, chunk_id, topic) VALUES (?, ?, ?, ?)", rows
+            )
+            db.commit()
+
+    def topic_summary(self, collection: str, limit: int = 20, offset: int = 0):
+        """Topics of a collection by number of chunks, as ([{topic, chunks, documents}], total topics)."""
+        with self._lock:
+            db = self._db()
+            total = db.execute(
+                "SELECT COUNT(DISTINCT topic) FROM chunk_topics WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+            rows = db.execute(
+                "SELECT topic, COUNT(*) AS chunks, COUNT(DISTINCT source) FROM chunk_topics WHERE collection = ? "
+                "GROUP BY topic ORDER BY chunks DESC, topic LIMIT ? OFFSET ?",
+                (collection, limit, offset),
+            ).fetchall()
+        return [{"topic": topic, "chunks": chunks, "documents": documents} for topic, chunks, documents in rows], total
+
+    def generation(self, collection: str) -> int:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT generation FROM generations WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self, collection: str):
+        """Marks the collection's content as changed."""
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO generations (collection, generation) VALUES (?, 1) "
+                "ON CONFLICT (collection) DO UPDATE SET generation = generation + 1",
+                (collection,),
+            )
+            db.commit()
+
+    def set_fingerprint(self, collection: str, source: str, fingerprint: str):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO documents (collection, source, fingerprint, updated_at) VALUES (?, ?, ?, ?)",
+                (collection, source, fingerprint, time.time()),
+            )
+            db.commit()
+
+
+document_registry = DocumentRegistry()
@@ -1,55 +1,70 @@
+import asyncio
 import os
 from werkzeug.utils import secure_filename
-from backend.factory.parser_factory import get_parser
-from langchain_openai import OpenAIEmbeddings
-from langchain_milvus import Milvus
-from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from backend.services.ingestion_pipeline import IngestionCancelled, ingest_documents
+from backend.services.document_registry import document_registry, file_fingerprint, text_fingerprint
+from backend.services.semantic_cache import collection_key
+from backend.factory.loader_factory import get_loader
 from langchain.docstore.document import Document
-from motor.motor_asyncio import AsyncIOMotorClient
-from keybert import KeyBERT
+from bson import ObjectId
+from bson.errors import InvalidId
+from backend.utils.mongo_client import get_mongo_client
+from backend.config.default_config import MONGO_DB_NAME, MONGO_COLLECTION
 
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 0
-async def process_file(filepath:str,config:dict,job_id:str,statuses: dict):
-    """Process an uploaded file through RAG pipeline asynchronously"""
-    def update_status(message, progress=None):
-        statuses[job_id] = {"status": "processing", "message": message, "progress": progress}
+async def process_file(filepath:str,config:dict,job_id:str,statuses, should_cancel=None):
+    """Process an uploaded file through RAG pipeline asynchronously.
+
+    statuses is any dict-like status store keyed by job id, e.g. the job queue's.
+    """
+    def update_status(message, progress=None, **details):
+        statuses[job_id] = {"status": "processing", "message": message, "progress": progress, **details}
 
     vectordb = config.get("vectordb", "milvus").lower()
-    collection_name = config.get("collection_name", "documents")
     
     try:
 
         update_status("Loading document content...")
         filename = os.path.basename(filepath)
-        loader = PyPDFLoader(filepath) if filename.endswith(".pdf") else TextLoader(filepath)
-        documents = loader.load()
-
-        update_status("Splitting document into chunks...")
-        text_splitter = get_parser(config)
-        chunks = text_splitter.split_documents(documents)
-        total_chunks = len(chunks)
-        update_status(f"Preparing to embed {total_chunks} chunks...")
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        
-      
-        update_status(f"Embedding and ingesting {total_chunks} chunks into {vectordb}...")
-        if vectordb == "milvus":
-            Milvus.from_documents(
-                documents=chunks, embedding=embeddings, collection_name=collection_name,
-                connection_args={"uri": os.environ.get("MILVUS_URL"), "token": os.environ.get("MILVUS_TOKEN")},
-            )
-        elif vectordb == "chroma":
-            persist_directory = config.get("persist_directory", "chroma_db")
-            Chroma.from_documents(
-                documents=chunks, embedding=embeddings, collection_name=collection_name,
-                persist_directory=persist_directory
+        loader = get_loader(filepath, config)
+        page_count = getattr(loader, "page_count", None)
+        # Parsing the page tree is blocking; the loader keeps the count for its own pass
+        total_pages = await asyncio.to_thread(page_count) if page_count is not None else 1
+
+        def on_progress(pages_done, chunks_done):
+            update_status(
+                f"Ingested {chunks_done} chunks from {pages_done}/{total_pages} pages into {vectordb}...",
+                progress=round(pages_done / total_pages * 100, 2) if total_pages else None,
+                pages_processed=pages_done,
+                total_pages=total_pages,
+                chunks_processed=chunks_done,
             )
-        statuses[job_id] = {"status": "complete", "message": f"Successfully ingested {total_chunks} chunks."}    
 
-        return f"Successfully ingested {len(chunks)} chunks into {vectordb}."
+        # Pages are loaded lazily and streamed through split -> embed -> upsert in batches.
+        # Re-uploads of the same file name only upsert changed chunks and delete removed ones.
+        fingerprint = await asyncio.to_thread(file_fingerprint, filepath)
+        counts = await ingest_documents(
+            loader.lazy_load(), config, on_progress=on_progress, should_cancel=should_cancel,
+            source=filename, fingerprint=fingerprint,
+        )
+        message = (
+            f"Successfully ingested {filename}: {counts['added']} chunks added, "
+            f"{counts['removed']} removed, {counts['skipped']} unchanged."
+        )
+        statuses[job_id] = {
+            "status": "complete",
+            "message": message,
+            "progress": 100,
+            "total_pages": total_pages,
+            "chunks_processed": counts["added"] + counts["skipped"],
+            **counts,
+        }
+
+        return message
+    except IngestionCancelled:
+        statuses[job_id] = {"status": "cancelled", "message": "Job was cancelled; chunks ingested so far were kept."}
     except Exception as e:
         statuses[job_id] = {"status": "error", "message": f"An error occurred: {e}"}
     finally:
@@ -58,55 +73,59 @@ async def process_file(filepath:str,config:dict,job_id:str,statuses: dict):
 
 
 async def process_text(text_content:str, config:dict):
-    """Process plain text through RAG pipeline asynchronously"""
+    """Process plain text through RAG pipeline asynchronously; returns the answer message and chunk counts"""
     vectordb = config.get("vectordb", "milvus").lower()
-    collection_name = config.get("collection_name", "documents")
 
     try:
-        documents = [Document(page_content=text_content)]
-        text_splitter = get_parser(config)
-        chunks = text_splitter.split_documents(documents)
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        if vectordb == "milvus":
-            Milvus.from_documents(
-                documents=chunks, embedding=embeddings, collection_name=collection_name,
-                connection_args={"uri": os.environ.get("MILVUS_URL"), "token": os.environ.get("MILVUS_TOKEN")},
-            )
-        elif vectordb == "chroma":
-            persist_directory = config.get("persist_directory", "chroma_db")
-            Chroma.from_documents(
-                documents=chunks, embedding=embeddings, collection_name=collection_name,
-                persist_directory=persist_directory
-            )
-        return f"Successfully ingested {len(chunks)} text chunks into {vectordb}."
+        # config["source"] names the text so a changed version replaces the old one
+        fingerprint = text_fingerprint(text_content)
+        source = config.get("source") or f"text:{fingerprint}"
+        documents = [Document(page_content=text_content, metadata={"source": source})]
+        counts = await ingest_documents(documents, config, source=source, fingerprint=fingerprint)
+        return {
+            "answer": (
+                f"Successfully ingested text into {vectordb}: {counts['added']} chunks added, "
+                f"{counts['removed']} removed, {counts['skipped']} unchanged."
+            ),
+            **counts,
+        }
     except Exception as e:
-        return f"An error occurred: {e}"
-
-
-async def extract_topics_from_documents(limit=20):
-    docs = await list_documents(limit=limit)
-    kw_model = KeyBERT()
-    topics = []
-    for doc in docs:
-        text = doc.get("page_content", "")
-        if text:
-            keywords = kw_model.extract_keywords(text, top_n=5)
-            topics.append({
-                "source": doc.get("metadata", {}).get("source"),
-                "topics": [kw for kw, _ in keywords]
-            })
-    return topics
-async def list_documents(query=None, limit=20):
-    """List documents in the MongoDB collection asynchronously"""
+        return {"answer": f"An error occurred: {e}"}
+
+
+async def list_topics(config: dict, limit: int = 20, offset: int = 0):
+    """Topic summary of a collection, precomputed at ingestion time"""
+    collection = "/".join(collection_key(config))
+    return await asyncio.to_thread(document_registry.topic_summary, collection, limit, offset)
+
+
+# Large fields left out of listings unless explicitly requested
+LISTING_EXCLUDED_FIELDS = {"page_content": 0, "text": 0, "embedding": 0}
+
+
+def _documents_query(query=None, after=None):
+    query = dict(query or {})
+    if after:
+        try:
+            query["_id"] = {"$gt": ObjectId(after)}
+        except InvalidId:
+            query["_id"] = {"$gt": after}
+    return query
+
+
+def _projection(fields=None):
+    return {field: 1 for field in fields} if fields else LISTING_EXCLUDED_FIELDS
+
+
+async def list_documents(query=None, limit=20, after=None, fields=None):
+    """List documents in the MongoDB collection asynchronously, in _id order.
+
+    after is the _id of the last document of the previous page; fields selects
+    the returned fields, by default everything except text and vectors.
+    """
     try:
-        mongodb_uri = os.environ.get("MONGO_DB_URI")
-        client = AsyncIOMotorClient(mongodb_uri)
-        db_name = "rag_db"
-        collection_name = "documents"
-        collection = client[db_name][collection_name]
-        if query is None:
-            query = {}
-        docs_cursor = collection.find(query).limit(limit)
+        collection = get_mongo_client()[MONGO_DB_NAME][MONGO_COLLECTION]
+        docs_cursor = collection.find(_documents_query(query, after), _projection(fields)).sort("_id", 1).limit(limit)
         docs = await docs_cursor.to_list(length=limit)
         for doc in docs:
             doc["_id"] = str(doc["_id"])
@@ -115,6 +134,21 @@ async def list_documents(query=None, limit=20):
         print(f"Error listing documents: {e}")
         return []
 
+
+async def stream_documents(query=None, after=None, fields=None, batch_size=500):
+    """Yields lists of up to batch_size documents, walking the whole collection with one cursor"""
+    collection = get_mongo_client()[MONGO_DB_NAME][MONGO_COLLECTION]
+    cursor = collection.find(_documents_query(query, after), _projection(fields)).sort("_id", 1).batch_size(batch_size)
+    batch = []
+    async for doc in cursor:
+        doc["_id"] = str(doc["_id"])
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 # Example usage (would need to be run in an asyncio event loop):
 # async def main():
 #   # Example: text_result = await process_text("This is a test document.", index_mech="FLAT")
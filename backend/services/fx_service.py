@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from forex_python.converter import CurrencyRates
+from backend.config.default_config import FX_BASE_CURRENCY, FX_REFRESH_SECONDS, FX_RATES_FILE
+
+
+class ExchangeRates:
+    """In-process exchange-rate table, refreshed periodically in a background thread.
+
+    Rates are stored against one base currency, so any pair is converted locally
+    with a dictionary lookup: rate(a, b) = rates[b] / rates[a].
+    """
+
+    def __init__(self, base=FX_BASE_CURRENCY, refresh_seconds=FX_REFRESH_SECONDS, seed_path=FX_RATES_FILE):
+        self.base = base.upper()
+        self.refresh_seconds = refresh_seconds
+        self.seed_path = seed_path
+        self.updated_at = None
+        self._rates = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_file(self, path: str):
+        """Seeds the table from a JSON file, e.g. for offline runs."""
+        with open(path) as f:
+            data = json.load(f)
+        self._set_rates(data.get("base", self.base), data["rates"])
+
+    def refresh(self):
+        """Fetches the full rate matrix for the base currency in one call. Blocking; one at a time."""
+        with self._refresh_lock:
+            rates = CurrencyRates().get_rates(self.base)
+            self._set_rates(self.base, rates)
+
+    def _set_rates(self, base, rates):
+        base = base.upper()
+        rates = {currency.upper(): float(rate) for currency, rate in rates.items()}
+        rates[base] = 1.0
+        with self._lock:
+            # Swap the whole table at once so readers never see a half-updated matrix
+            self._rates = rates
+            self.updated_at = time.time()
+
+    def start(self):
+        """Loads the seed file, if any, and starts the background refresher."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name="fx-refresh", daemon=True)
+        if self.seed_path:
+            try:
+                self.load_file(self.seed_path)
+            except Exception as e:
+                print(f"Error loading exchange rates from {self.seed_path}: {e}")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous (or seeded) table until the next attempt
+                print(f"Error refreshing exchange rates: {e}")
+            self._stop.wait(self.refresh_seconds)
+
+    def get_rate(self, from_currency: str, to_currency: str) -> float:
+        """Units of to_currency per one unit of from_currency, from the current snapshot.
+
+        Never blocks on the network, so it is safe to call from the event loop.
+        Raises ValueError for an unknown currency or while no rates are loaded yet.
+        """
+        if not self._rates:
+            # Loads the seed file, if any; the first fetch happens on the refresher thread
+            self.start()
+        rates = self._rates
+        if not rates:
+            raise ValueError("Exchange rates are not available yet")
+        try:
+            return rates[to_currency.upper()] / rates[from_currency.upper()]
+        except (KeyError, AttributeError):
+            raise ValueError(f"No exchange rate available for {from_currency} -> {to_currency}")
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        return amount * self.get_rate(from_currency, to_currency)
+
+
+fx_rates = ExchangeRates()
@@ -0,0 +1,192 @@
+import asyncio
+from backend.factory.client_registry import get_embeddings, get_vector_store
+from backend.factory.parser_factory import get_parser
+from backend.retrievers import get_bm25_index
+from backend.services.semantic_cache import collection_key, semantic_cache
+from backend.services.document_registry import chunk_fingerprint, document_registry, text_fingerprint
+from backend.services.topic_service import extract_topics
+from backend.config.default_config import INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE, TOPICS_ENABLED
+
+# Sentinel passed down the queues once the previous stage has no more batches
+_DONE = object()
+
+
+class IngestionCancelled(Exception):
+    """Raised by ingest_documents when should_cancel() reports that the job was cancelled."""
+
+
+def _split_next_page(pages, text_splitter):
+    """Pulls the next page from the loader and splits it. Returns None when the loader is exhausted."""
+    page = next(pages, None)
+    if page is None:
+        return None
+    return text_splitter.split_documents([page])
+
+
+async def ingest_documents(documents, config: dict, on_progress=None, should_cancel=None,
+                           source: str = None, fingerprint: str = None):
+    """Streams documents through load/split -> embed -> topics -> upsert.
+
+    documents can be any iterable of Documents, e.g. a loader's lazy_load(); it is
+    consumed one page at a time. The stages are connected by bounded queues, so
+    only a few batches are held in memory regardless of the document size.
+    on_progress(pages_done, chunks_done) is called after every upserted batch.
+    should_cancel() is polled between pages and batches; once it returns True
+    the stages stop and IngestionCancelled is raised. Batches already upserted stay.
+
+    With a source name the ingestion is incremental against the document
+    registry: an unchanged fingerprint skips the document, unchanged chunks are
+    neither embedded nor upserted, and chunks no longer produced are deleted.
+    Returns {"added", "removed", "skipped"} chunk counts.
+    """
+    collection = "/".join(collection_key(config))
+    if source is not None and fingerprint is not None:
+        if await asyncio.to_thread(document_registry.fingerprint, collection, source) == fingerprint:
+            existing = await asyncio.to_thread(document_registry.chunk_ids, collection, source)
+            return {"added": 0, "removed": 0, "skipped": len(existing)}
+
+    batch_size = int(config.get("batch_size", INGEST_BATCH_SIZE))
+    text_splitter = get_parser(config)
+    embeddings = get_embeddings()
+    vector_store = await asyncio.to_thread(get_vector_store, config)
+    bm25_index = await asyncio.to_thread(get_bm25_index, config)
+    existing = set()
+    if source is not None:
+        existing = await asyncio.to_thread(document_registry.chunk_ids, collection, source)
+        # Until this run completes the stored chunks no longer match any fingerprint
+        await asyncio.to_thread(document_registry.set_fingerprint, collection, source, None)
+    seen = set()
+    skipped = 0
+
+    tag_topics_enabled = str(config.get("extract_topics", TOPICS_ENABLED)).lower() == "true"
+
+    embed_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    topic_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    upsert_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+
+    def check_cancelled():
+        if should_cancel is not None and should_cancel():
+            raise IngestionCancelled("Ingestion was cancelled")
+
+    async def load_and_split():
+        nonlocal skipped
+        pages = iter(documents)
+        pages_done = 0
+        chunk_index = 0
+        # Keyed by a hash of the chunk text, so a long document does not keep all its text alive
+        occurrences = {}
+        batch = []
+        while True:
+            await asyncio.to_thread(check_cancelled)
+            chunks = await asyncio.to_thread(_split_next_page, pages, text_splitter)
+            if chunks is None:
+                break
+            pages_done += 1
+            for chunk in chunks:
+                chunk.metadata["chunk_index"] = chunk_index
+                chunk_index += 1
+                if source is not None:
+                    content_key = text_fingerprint(chunk.page_content)
+                    occurrence = occurrences.get(content_key, 0)
+                    occurrences[content_key] = occurrence + 1
+                    chunk_id = chunk_fingerprint(source, chunk.page_content, occurrence)
+                    chunk.metadata["source"] = source
+                    chunk.metadata["chunk_id"] = chunk_id
+                    seen.add(chunk_id)
+                    if chunk_id in existing:
+                        skipped += 1
+                        continue
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    await embed_queue.put((batch, pages_done))
+                    batch = []
+        if batch:
+            await embed_queue.put((batch, pages_done))
+        await embed_queue.put(_DONE)
+
+    async def embed():
+        while True:
+            item = await embed_queue.get()
+            if item is _DONE:
+                await topic_queue.put(_DONE)
+                return
+            batch, _ = item
+            # The vectors land in the embedding cache, so the upsert stage reads them back from memory
+            await asyncio.to_thread(embeddings.embed_documents, [chunk.page_content for chunk in batch])
+            await topic_queue.put(item)
+
+    async def tag_topics():
+        nonlocal tag_topics_enabled
+        while True:
+            item = await topic_queue.get()
+            if item is _DONE:
+                await upsert_queue.put(_DONE)
+                return
+            batch, _ = item
+            # Every chunk carries the field, so a collection created with it accepts every insert
+            for chunk in batch:
+                chunk.metadata["topics"] = ""
+            if tag_topics_enabled:
+                try:
+                    topics = await asyncio.to_thread(extract_topics, [chunk.page_content for chunk in batch])
+                    for chunk, chunk_topics in zip(batch, topics):
+                        # Vector store metadata must be scalar, so topics are stored comma separated
+                        chunk.metadata["topics"] = ", ".join(chunk_topics)
+                except Exception as e:
+                    # Topics are optional; keep ingesting without them
+                    print(f"ERROR: Topic extraction failed, ingesting without topics. Error: {e}")
+                    tag_topics_enabled = False
+            await upsert_queue.put(item)
+
+    async def upsert():
+        chunks_done = 0
+        while True:
+            item = await upsert_queue.get()
+            if item is _DONE:
+                return chunks_done
+            batch, pages_done = item
+            await asyncio.to_thread(check_cancelled)
+            if source is not None:
+                ids = [chunk.metadata["chunk_id"] for chunk in batch]
+                await asyncio.to_thread(vector_store.add_documents, batch, ids=ids)
+                # Keep the keyword index used by hybrid search in step with the vector store
+                await asyncio.to_thread(bm25_index.add_documents, batch, ids)
+                await asyncio.to_thread(document_registry.add_chunks, collection, source, ids)
+                topics_by_chunk = {
+                    chunk.metadata["chunk_id"]: chunk.metadata["topics"].split(", ")
+                    for chunk in batch if chunk.metadata.get("topics")
+                }
+                if topics_by_chunk:
+                    await asyncio.to_thread(document_registry.add_topics, collection, source, topics_by_chunk)
+            else:
+                await asyncio.to_thread(vector_store.add_documents, batch)
+                await asyncio.to_thread(bm25_index.add_documents, batch)
+            chunks_done += len(batch)
+            if on_progress:
+                on_progress(pages_done, chunks_done + skipped)
+
+    tasks = [
+        asyncio.create_task(load_and_split()),
+        asyncio.create_task(embed()),
+        asyncio.create_task(tag_topics()),
+        asyncio.create_task(upsert()),
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+        removed = sorted(existing - seen)
+        if removed:
+            await asyncio.to_thread(vector_store.delete, ids=removed)
+            await asyncio.to_thread(bm25_index.delete, removed)
+            await asyncio.to_thread(document_registry.remove_chunks, collection, source, removed)
+        if source is not None and fingerprint is not None:
+            await asyncio.to_thread(document_registry.set_fingerprint, collection, source, fingerprint)
+    except BaseException:
+        # One stage failed; stop the others instead of leaving them blocked on a full queue
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        # Cached answers may be grounded on an outdated view of this collection, in any process
+        await asyncio.to_thread(document_registry.bump_generation, collection)
+        semantic_cache.invalidate(collection_key(config))
+    return {"added": results[-1], "removed": len(removed), "skipped": skipped}
@@ -0,0 +1,325 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from backend.services.semantic_cache import collection_key
+from backend.utils.event_loop import run_async
+from backend.config.default_config import (
+    JOB_QUEUE_PATH,
+    INGEST_WORKERS,
+    INGEST_MAX_PENDING,
+    INGEST_PER_COLLECTION,
+    JOB_RETENTION_SECONDS,
+    JOB_LEASE_SECONDS,
+)
+
+ACTIVE_STATES = ("queued", "processing")
+FINISHED_STATES = ("complete", "error", "cancelled")
+
+# Marks the jobs this process claims. PIDs cannot tell processes apart: in a
+# container the server is PID 1 after every restart, and PIDs are reused.
+PROCESS_TOKEN = uuid.uuid4().hex
+
+
+class QueueFull(Exception):
+    """Raised by enqueue when too many jobs are waiting; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Ingestion queue is full, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+def _remove_upload(filepath: str):
+    """Deletes an uploaded file and its per-upload directory once it is empty."""
+    try:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        os.rmdir(os.path.dirname(filepath))
+    except OSError:
+        pass
+
+
+class JobQueue:
+    """Ingestion jobs persisted in SQLite and run by a fixed pool of worker threads.
+
+    Every process that calls start() runs its own workers; they claim jobs from
+    the shared database with an immediate transaction, so several server
+    processes on one host split the queue between them. At most per_collection
+    jobs ingest into the same (vectordb, collection) at once, and enqueue refuses
+    new jobs with QueueFull once max_pending jobs are queued or running.
+    A running job holds a lease that its process renews every lease/3 seconds;
+    any process that finds the lease expired requeues the job.
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH, workers=INGEST_WORKERS, max_pending=INGEST_MAX_PENDING,
+                 per_collection=INGEST_PER_COLLECTION, retention=JOB_RETENTION_SECONDS,
+                 lease=JOB_LEASE_SECONDS):
+        self.path = path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.per_collection = per_collection
+        self.retention = retention
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, filepath TEXT NOT NULL, config TEXT NOT NULL, collection TEXT NOT NULL, "
+                "state TEXT NOT NULL, status TEXT NOT NULL, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+                "pid INTEGER, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+            # Databases created before job leases lack these columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, filepath: str, config: dict) -> str:
+        """Queues a file for ingestion and returns its job id; raises QueueFull when saturated."""
+        job_id = str(uuid.uuid4())
+        status = {"status": "queued", "message": "Upload received, waiting for a free ingestion worker."}
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                pending = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", ACTIVE_STATES
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    raise QueueFull(self._retry_after(db, pending))
+                db.execute(
+                    "INSERT INTO jobs (id, filepath, config, collection, state, status, created_at) "
+                    "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                    (job_id, filepath, json.dumps(config), "/".join(collection_key(config)),
+                     json.dumps(status), time.time()),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def _retry_after(self, db, pending) -> int:
+        """Seconds until a slot is likely free, from the average duration of recent jobs."""
+        row = db.execute(
+            "SELECT AVG(finished_at - started_at) FROM (SELECT finished_at, started_at FROM jobs "
+            "WHERE state = 'complete' ORDER BY finished_at DESC LIMIT 20)"
+        ).fetchone()
+        average = row[0] or 30.0
+        return max(1, math.ceil(average * (pending - self.max_pending + 1) / max(self.workers, 1)))
+
+    def status(self, job_id: str):
+        """Returns the job's last reported status dict, or None for unknown jobs."""
+        with self._lock:
+            row = self._db().execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_status(self, job_id: str, status: dict):
+        state = status.get("status", "processing")
+        finished_at = time.time() if state in FINISHED_STATES else None
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, state = ?, finished_at = COALESCE(?, finished_at) WHERE id = ?",
+                (json.dumps(status, default=str), state, finished_at, job_id),
+            )
+
+    def cancel(self, job_id: str):
+        """Cancels a queued job at once, or asks a running one to stop. Returns the new status or None."""
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row[0] == "queued":
+                status = {"status": "cancelled", "message": "Job was cancelled before it started."}
+                cursor = db.execute(
+                    "UPDATE jobs SET state = 'cancelled', status = ?, finished_at = ? WHERE id = ? AND state = 'queued'",
+                    (json.dumps(status), time.time(), job_id),
+                )
+                if cursor.rowcount:
+                    _remove_upload(db.execute("SELECT filepath FROM jobs WHERE id = ?", (job_id,)).fetchone()[0])
+                else:
+                    # A worker (possibly in another process) claimed it meanwhile; ask it to stop instead
+                    db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = 'processing'", (job_id,))
+            elif row[0] == "processing":
+                db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        return self.status(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._db().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _claim(self):
+        """Atomically moves the oldest runnable job to processing and returns (id, filepath, config)."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT id, filepath, config FROM jobs AS j WHERE state = 'queued' AND "
+                    "(SELECT COUNT(*) FROM jobs WHERE state = 'processing' AND collection = j.collection) < ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (self.per_collection,),
+                ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    db.execute(
+                        "UPDATE jobs SET state = 'processing', pid = ?, owner = ?, started_at = ?, heartbeat_at = ? "
+                        "WHERE id = ?",
+                        (os.getpid(), PROCESS_TOKEN, now, now, row[0]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def _heartbeat(self):
+        """Renews the lease of every job this process is running."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE state = 'processing' AND owner = ?",
+                (time.time(), PROCESS_TOKEN),
+            )
+
+    def _keep_leases(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                self._heartbeat()
+            except sqlite3.Error as e:
+                print(f"ERROR: Could not renew ingestion job leases. Error: {e}")
+
+    def _recover(self):
+        """Requeues jobs whose process stopped renewing their lease, i.e. died or was restarted."""
+        expired = time.time() - self.lease
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    "SELECT id, filepath FROM jobs WHERE state = 'processing' AND owner IS NOT ? "
+                    "AND COALESCE(heartbeat_at, started_at, 0) < ?",
+                    (PROCESS_TOKEN, expired),
+                ).fetchall()
+                for job_id, filepath in rows:
+                    if os.path.exists(filepath):
+                        db.execute(
+                            "UPDATE jobs SET state = 'queued', pid = NULL, owner = NULL, heartbeat_at = NULL "
+                            "WHERE id = ?",
+                            (job_id,),
+                        )
+                    else:
+                        status = {"status": "error", "message": "The server restarted and the upload was lost."}
+                        db.execute(
+                            "UPDATE jobs SET state = 'error', status = ?, finished_at = ? WHERE id = ?",
+                            (json.dumps(status), time.time(), job_id),
+                        )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def purge(self):
+        """Drops finished jobs older than the retention period."""
+        with self._lock:
+            self._db().execute(
+                "DELETE FROM jobs WHERE state IN (?, ?, ?) AND finished_at < ?",
+                (*FINISHED_STATES, time.time() - self.retention),
+            )
+
+    def start(self):
+        """Recovers interrupted jobs and starts the worker threads; safe to call more than once."""
+        if self._threads:
+            return
+        self._recover()
+        self.purge()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ingest-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._keep_leases, name="ingest-leases", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _work(self):
+        # Imported here to avoid loading the ingestion stack when only the queue is used
+        from backend.services.document_service import process_file
+
+        last_purge = last_recover = time.time()
+        while True:
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"ERROR: Could not claim an ingestion job. Error: {e}")
+                job = None
+            if job is None:
+                with self._wakeup:
+                    # Other processes enqueue too, so poll as well as waiting for a notify
+                    self._wakeup.wait(timeout=1.0)
+                try:
+                    # Picks up the jobs of processes that died after this one started
+                    if time.time() - last_recover > self.lease:
+                        self._recover()
+                        last_recover = time.time()
+                    if time.time() - last_purge > 3600:
+                        self.purge()
+                        last_purge = time.time()
+                except sqlite3.Error as e:
+                    print(f"ERROR: Could not maintain the ingestion queue. Error: {e}")
+                continue
+
+            job_id, filepath, config = job
+            try:
+                run_async(process_file(filepath, config, job_id, self.statuses,
+                                       should_cancel=lambda: self.cancel_requested(job_id)))
+            except Exception as e:
+                self.set_status(job_id, {"status": "error", "message": f"An error occurred: {e}"})
+            finally:
+                _remove_upload(filepath)
+
+    @property
+    def statuses(self):
+        return JobStatuses(self)
+
+
+class JobStatuses:
+    """Dict-style view of job statuses, the interface process_file reports progress through."""
+
+    def __init__(self, queue: JobQueue):
+        self._queue = queue
+
+    def __setitem__(self, job_id, status):
+        self._queue.set_status(job_id, status)
+
+    def __getitem__(self, job_id):
+        status = self._queue.status(job_id)
+        if status is None:
+            raise KeyError(job_id)
+        return status
+
+    def get(self, job_id, default=None):
+        status = self._queue.status(job_id)
+        return default if status is None else status
+
+
+job_queue = JobQueue()
@@ -0,0 +1,123 @@
+import threading
+import time
+import numpy as np
+from backend.config.default_config import (
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_MAX_ITEMS,
+)
+from backend.services.document_registry import document_registry
+
+
+def collection_key(config: dict) -> tuple:
+    """The (vectordb, collection) an answer was grounded on; used for invalidation."""
+    return (config.get("vectordb", "milvus").lower(), config.get("collection_name", "documents"))
+
+
+class SemanticCache:
+    """Cache of past answers, looked up by cosine similarity of the query embedding.
+
+    Entries live in a small in-memory vector index (one normalized row per
+    entry). A lookup only matches entries in the same namespace, e.g. the same
+    endpoint and search settings, and the best match must reach the threshold.
+
+    Every entry records the generation its collection had in the document
+    registry when it was stored. Ingestion in any process bumps that generation,
+    so a hit on an older one is dropped instead of answered.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL, max_items=SEMANTIC_CACHE_MAX_ITEMS,
+                 registry=document_registry):
+        self.registry = registry
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_items = max_items
+        self._vectors = None
+        self._entries = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _generation(self, collection: tuple) -> int:
+        return self.registry.generation("/".join(collection))
+
+    def lookup(self, namespace: str, embedding):
+        """Returns the cached value of the closest fresh entry above the threshold, or None."""
+        query = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            self._drop(lambda entry: entry["expires_at"] <= now)
+            entry = self._closest(namespace, query)
+        # Only a hit reads the registry, outside the lock since it may wait on SQLite
+        if entry is not None and entry["generation"] != self._generation(entry["collection"]):
+            self.invalidate(entry["collection"])
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["last_hit"] = now
+            self.hits += 1
+            return entry["value"]
+
+    def _closest(self, namespace, query):
+        if not self._entries:
+            return None
+        similarities = self._vectors @ query
+        candidates = [i for i, entry in enumerate(self._entries) if entry["namespace"] == namespace]
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda i: similarities[i])
+        return self._entries[best] if similarities[best] >= self.threshold else None
+
+    def store(self, namespace: str, collection: tuple, query: str, embedding, value):
+        now = time.time()
+        vector = self._normalize(embedding)
+        generation = self._generation(collection)
+        with self._lock:
+            self._drop(lambda entry: entry["expires_at"] <= now)
+            if len(self._entries) >= self.max_items:
+                # Evict the least recently used entry
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_hit"])
+                self._drop(lambda entry: entry is self._entries[oldest])
+            self._entries.append({
+                "namespace": namespace,
+                "collection": collection,
+                "generation": generation,
+                "query": query,
+                "value": value,
+                "expires_at": now + self.ttl,
+                "last_hit": now,
+            })
+            row = vector[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+
+    def invalidate(self, collection: tuple):
+        """Drops this process's answers grounded on the given (vectordb, collection), e.g. after re-ingestion."""
+        with self._lock:
+            self._drop(lambda entry: entry["collection"] == collection)
+
+    def _drop(self, predicate):
+        keep = [i for i, entry in enumerate(self._entries) if not predicate(entry)]
+        if len(keep) == len(self._entries):
+            return
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep] if keep else None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "items": len(self._entries),
+        }
+
+
+semantic_cache = SemanticCache()
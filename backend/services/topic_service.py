@@ -0,0 +1,27 @@
+import threading
+from backend.config.default_config import TOPIC_MODEL, TOPICS_PER_CHUNK
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_keyword_model():
+    """Returns the shared KeyBERT model; the sentence-transformer is loaded once per process."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from keybert import KeyBERT
+                _model = KeyBERT(model=TOPIC_MODEL)
+    return _model
+
+
+def extract_topics(texts, top_n: int = TOPICS_PER_CHUNK):
+    """Keywords for each text, extracted in one batch. Returns one list of keywords per text."""
+    if not texts:
+        return []
+    keywords = get_keyword_model().extract_keywords(list(texts), top_n=top_n)
+    # KeyBERT returns a flat list of (keyword, score) for a single document
+    if len(texts) == 1:
+        keywords = [keywords]
+    return [[keyword for keyword, _ in doc_keywords] for doc_keywords in keywords]
@@ -1,4 +1,8 @@
-from langchain_openai import ChatOpenAI
+from backend.factory.client_registry import get_embeddings, get_llm
+from backend.local_router import get_local_router, log_routing_decision
+from backend.utils.budget import budget_exceeded, record_usage, start_budget
+from backend.utils.metrics import time_agent_node
+from backend.config.default_config import ROUTER_CONFIDENCE_THRESHOLD
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel
@@ -6,10 +10,55 @@ from pydantic import BaseModel
 class TopicSelectionParser(BaseModel):
     agent: str  # Should be "A", "B", or "C"
 
+# The route whose output each llm_agent answer_source label stands for
+ANSWER_SOURCE_ROUTES = {
+    "RAG Agent (Internal Documents)": "rag",
+    "Web Agent (Live Web Search)": "web",
+    "LLM Agent (General Knowledge)": "llm",
+}
+
+@time_agent_node
 def supervisor(state):
+    """ Decide which node to use next, using the local router and the llm only when it is unsure"""
+    start_budget(state)
+    state.iterations += 1
+    if budget_exceeded(state):
+        # Nothing left to spend; let the validator return the best answer so far
+        state.budget_exhausted = True
+        state.next_agent = "validator"
+        return state
+
+    # On a retry the previous answer failed validation. The local router cannot read the
+    # feedback, so it picks the best of the other agents, and the LLM router (which does
+    # see the feedback) is only asked when that choice is not confident. Every route ends
+    # in the llm node, so answer_source tells which agent's output failed; the routed
+    # agent is left out too, e.g. a rag route that found no documents would find none again.
+    exclude = ()
+    if state.feedback:
+        exclude = tuple({state.next_agent, ANSWER_SOURCE_ROUTES.get(state.answer_source, state.next_agent)})
+    local_route, confidence = None, None
+    try:
+        router = get_local_router()
+        if router is not None:
+            local_route, confidence = router.predict(get_embeddings().embed_query(state.query), exclude=exclude)
+    except Exception as e:
+        print(f"ERROR: Local router failed, falling back to LLM routing. Error: {e}")
+
+    if local_route is not None and confidence >= ROUTER_CONFIDENCE_THRESHOLD:
+        state.next_agent = local_route
+        source = "local"
+    else:
+        state.next_agent = route_with_llm(state)
+        source = "llm"
+
+    log_routing_decision(state.query, state.next_agent, source, local_route, confidence, state.feedback)
+    return state
+
+
+def route_with_llm(state):
     """ Using llm to decide which node to use next"""
     parser = JsonOutputParser(pydantic_object=TopicSelectionParser)
-    llm = ChatOpenAI(model_name="gpt-4o" ,temperature=0)
+    llm = get_llm(model_name="gpt-4o", temperature=0)
     routing_prompt = PromptTemplate(
         input_variables=["query","format_instructions"],
         template=(
@@ -26,7 +75,9 @@ def supervisor(state):
     query=state.query + "\nValidation feedback: " + (state.feedback or ""),
     format_instructions=parser.get_format_instructions()
     )
-    llm_response = llm.invoke(prompt).content
+    response = llm.invoke(prompt)
+    record_usage(state, response)
+    llm_response = response.content
 
 
     try:
@@ -34,13 +85,11 @@ def supervisor(state):
         parsed = parser.parse(llm_response)
         agent_map = {"A": "rag", "B": "web", "C": "llm"}
         # Use dictionary key access
-        state.next_agent = agent_map.get(parsed['agent'].strip().upper(), "llm")
+        return agent_map.get(parsed['agent'].strip().upper(), "llm")
     except Exception as e:
         print(f"ERROR: Supervisor failed to parse routing decision. Defaulting to LLM. Error: {e}")
-        state.next_agent = "llm"
-        
-    return state
+        return "llm"
 
 
 
-    
\ No newline at end of file
+    
@@ -0,0 +1,38 @@
+import re
+import tiktoken
+from backend.parsers.recursive_parser import RecursiveTokenSplitter
+
+
+def toy_encoding():
+    """Byte-level encoding that, like cl100k_base, puts a word's leading space in its first token (" w")."""
+    ranks = {bytes([i]): i for i in range(256)}
+    ranks[b" w"] = 256
+    return tiktoken.Encoding(
+        name="toy",
+        pat_str=r""" ?[a-z]+| ?[0-9]+| ?[^\sa-z0-9]+|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
+def test_words_survive_space_cuts():
+    text = " ".join(f"w{i}" for i in range(400))
+    splitter = RecursiveTokenSplitter(chunk_size=50, chunk_overlap=10, encoding=toy_encoding())
+    chunks = splitter.split_text(text)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert all(re.fullmatch(r"w\d+", word) for word in chunk.split()), chunk
+    assert chunks[0].startswith("w0 w1") and chunks[-1].endswith("w399")
+
+
+def test_sentence_cuts_keep_the_period():
+    text = " ".join(f"w{i} w{i}." for i in range(200))
+    splitter = RecursiveTokenSplitter(chunk_size=40, chunk_overlap=0, separators=[". ", " ", ""],
+                                      encoding=toy_encoding())
+    for chunk in splitter.split_text(text):
+        assert chunk.endswith("."), chunk
+
+
+if __name__ == "__main__":
+    test_words_survive_space_cuts()
+    test_sentence_cuts_keep_the_period()
@@ -3,10 +3,27 @@ from backend.tools.base_tools import TravelTool
 import os
 import re
 from amadeus import Client, ResponseError
-from forex_python.converter import CurrencyRates
+from backend.services.fx_service import fx_rates
+from backend.utils.metrics import track_outbound
 
 AMADEUS_API_KEY = os.getenv("AMADEUS_API_KEY")
 AMADEUS_API_SECRET = os.getenv("AMADEUS_API_SECRET")
+# Optional API host override, e.g. a local stand-in server ("127.0.0.1:8080", plain HTTP)
+AMADEUS_HOST = os.getenv("AMADEUS_HOST")
+
+_amadeus = None
+
+
+def get_amadeus_client():
+    """Returns the shared Amadeus client, which reuses its access token across searches."""
+    global _amadeus
+    if _amadeus is None:
+        options = {}
+        if AMADEUS_HOST:
+            host, _, port = AMADEUS_HOST.partition(":")
+            options = {"host": host, "port": int(port or 80), "ssl": False}
+        _amadeus = Client(client_id=AMADEUS_API_KEY, client_secret=AMADEUS_API_SECRET, **options)
+    return _amadeus
 
 def extract_float(price_str):
     # This will extract the first float number from the string
@@ -14,30 +31,33 @@ def extract_float(price_str):
     return float(match.group(1)) if match else 0.0
 class FlightSearchTool(TravelTool):
     """Tool for searching scheduled flights between two airports, including return, using Amadeus API."""
+    writes = ("flights_onward", "flights_return", "flight_onward_prices", "flight_return_prices")
+    cache_ttl = 15 * 60
+    cache_stale_ttl = 5 * 60
+    cache_params = ("from", "to", "start_date", "return_date", "adults", "currency")
+
     async def execute(self, state):
         user_currency = state.query.get("currency", "EUR")
-        currencyConvertor = CurrencyRates()
-        exchange_rate = await asyncio.to_thread(currencyConvertor.get_rate, 'EUR', user_currency)
         origin = state.query.get("from")     
         destination = state.query.get("to")   
         date = state.query.get("start_date") 
         return_date = state.query.get("return_date")  
         n_persons = state.query.get("adults", 1)
 
-        amadeus = Client(
-            client_id=AMADEUS_API_KEY,
-            client_secret=AMADEUS_API_SECRET
-        )
+        amadeus = get_amadeus_client()
 
         try:
             # Onward flights
-            response_onward = amadeus.shopping.flight_offers_search.get(
-                originLocationCode=origin,
-                destinationLocationCode=destination,
-                departureDate=date,
-                adults=n_persons,
-                max=5
-            )
+            # The Amadeus SDK is blocking, so keep it off the event loop while other tools run
+            with track_outbound("amadeus"):
+                response_onward = await asyncio.to_thread(
+                    amadeus.shopping.flight_offers_search.get,
+                    originLocationCode=origin,
+                    destinationLocationCode=destination,
+                    departureDate=date,
+                    adults=n_persons,
+                    max=5
+                )
             flights_onward = response_onward.data
             flight_list_onward = []
             for flight in flights_onward:
@@ -48,7 +68,7 @@ class FlightSearchTool(TravelTool):
                 price_eur = extract_float(flight['price']['total'])
                 price_currency = flight['price']['currency']
                 if price_currency != user_currency:
-                    converted_price = round(price_eur * exchange_rate, 2)
+                    converted_price = round(fx_rates.convert(price_eur, price_currency, user_currency), 2)
                     price_str = f"{converted_price} {user_currency} (converted from {price_eur} {price_currency})"
                 else:
                     price_str = f"{price_eur} {price_currency}"
@@ -61,13 +81,15 @@ class FlightSearchTool(TravelTool):
             # Return flights (if return_date provided)
             flight_list_return = []
             if return_date:
-                response_return = amadeus.shopping.flight_offers_search.get(
-                    originLocationCode=destination,
-                    destinationLocationCode=origin,
-                    departureDate=return_date,
-                    adults=n_persons,
-                    max=5
-                )
+                with track_outbound("amadeus"):
+                    response_return = await asyncio.to_thread(
+                        amadeus.shopping.flight_offers_search.get,
+                        originLocationCode=destination,
+                        destinationLocationCode=origin,
+                        departureDate=return_date,
+                        adults=n_persons,
+                        max=5
+                    )
                 flights_return = response_return.data
                 for flight in flights_return:
                     segments = flight['itineraries'][0]['segments']
@@ -77,7 +99,7 @@ class FlightSearchTool(TravelTool):
                     price_eur = extract_float(flight['price']['total'])
                     price_currency = flight['price']['currency']
                     if price_currency != user_currency:
-                        converted_price = round(price_eur * exchange_rate, 2)
+                        converted_price = round(fx_rates.convert(price_eur, price_currency, user_currency), 2)
                         price_str = f"{converted_price} {user_currency} (converted from {price_eur} {price_currency})"
                     else:
                         price_str = f"{price_eur} {price_currency}"
@@ -99,7 +121,8 @@ class FlightSearchTool(TravelTool):
                     "return": flight_list_return
                 }
             })
-        except ResponseError as e:
+        except (ResponseError, ValueError) as e:
+            # ValueError: a price in a currency the exchange-rate table cannot convert
             state.flights_onward = []
             state.flights_return = []
             state.messages.append({
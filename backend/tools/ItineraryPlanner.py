@@ -3,6 +3,8 @@ from backend.tools.base_tools import TravelTool
 
 class ItineraryPlannerTool(TravelTool):
     """ tool for planning the itinerary for attractions planned"""
+    reads = ("attractions", "restaurants", "hotels", "transportation")
+    writes = ("itinerary",)
 
     async def execute(self,state):
         
@@ -1,12 +1,34 @@
 from backend.tools.base_tools import TravelTool
+from backend.utils.http_client import get_async_client
+from backend.config.default_config import HTTP_TIMEOUT, PLACES_CATEGORY_TIMEOUTS
+import asyncio
 import os
-import httpx
 
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 GOOGLE_PLACES_ENDPOINT = os.getenv("GOOGLE_PLACES_ENDPOINT")
 
 class AttractionSearchTool(TravelTool):
     """Tool for searching attractive destinations."""
+    writes = ("attractions", "restaurants", "transportation", "activities", "hotels")
+    cache_ttl = 24 * 3600
+    cache_stale_ttl = 24 * 3600
+    cache_params = ("destination", "start_date")
+
+    async def _search_category(self, client, key, query):
+        """Runs one Places text search and returns the place names."""
+        params = {
+            "query": query,
+            "key": GOOGLE_PLACES_API_KEY,
+            "type": key
+        }
+        response = await client.get(GOOGLE_PLACES_ENDPOINT, params=params)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") != "OK":
+            return []
+        places = data.get("results", [])
+        return [place.get("name") for place in places]
+
     async def execute(self, state):
         destination = state.query.get("destination")
         start_date = state.query.get("start_date")
@@ -17,46 +39,48 @@ class AttractionSearchTool(TravelTool):
             "activities": f"things to do in {destination} on {start_date}" if start_date else f"things to do in {destination}",
             "hotels": f"hotels in {destination} on {start_date}" if start_date else f"hotels in {destination}"
         }
-        results = {}
 
-        try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                for key, query in categories.items():
-                    params = {
-                        "query": query,
-                        "key": GOOGLE_PLACES_API_KEY,
-                        "type": key
-                    }
-                    response = await client.get(GOOGLE_PLACES_ENDPOINT, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                    if data.get("status") != "OK":
-                        results[key] = []
-                    else:
-                        places = data.get("results", [])
-                        results[key] = [place.get("name") for place in places]
+        # Fan the five lookups out over the shared connection pool; each category has
+        # its own deadline so one slow or failing query does not empty the others
+        client = get_async_client()
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self._search_category(client, key, query),
+                    timeout=PLACES_CATEGORY_TIMEOUTS.get(key, HTTP_TIMEOUT),
+                )
+                for key, query in categories.items()
+            ),
+            return_exceptions=True,
+        )
+        results = {}
+        errors = {}
+        for key, outcome in zip(categories, outcomes):
+            if isinstance(outcome, Exception):
+                results[key] = []
+                errors[key] = str(outcome) or type(outcome).__name__
+            else:
+                results[key] = outcome
 
-            # Assign results to state fields after the loop
-            state.attractions = results.get("attractions", [])
-            state.restaurants = results.get("restaurants", [])
-            state.transportation = results.get("transportation", [])
-            state.activities = results.get("activities", [])
-            state.hotels = results.get("hotels", [])
+        state.attractions = results["attractions"]
+        state.restaurants = results["restaurants"]
+        state.transportation = results["transportation"]
+        state.activities = results["activities"]
+        state.hotels = results["hotels"]
+        if len(errors) == len(categories):
             state.messages.append({
                 "role": "tool",
                 "tool_name": "AttractionSearchTool",
-                "content": f"Found attractions for {destination}",
-                "result": results
+                "content": f"Error fetching attractions for {destination}: {errors}"
             })
-        except Exception as e:
-            state.attractions = []
-            state.restaurants = []
-            state.transportation = []
-            state.activities = []
-            state.hotels = []
-            state.messages.append({
+        else:
+            message = {
                 "role": "tool",
                 "tool_name": "AttractionSearchTool",
-                "content": f"Error fetching attractions for {destination}: {str(e)}"
-            })
-        return state
\ No newline at end of file
+                "content": f"Found attractions for {destination}",
+                "result": results
+            }
+            if errors:
+                message["errors"] = errors
+            state.messages.append(message)
+        return state
@@ -1,12 +1,103 @@
+import asyncio
+import copy
+import json
 from abc import ABC, abstractmethod
 from backend.state_schema.travel_planner_schema import TravelPlannerState
+from backend.utils.cache import TTLCache
+from backend.utils.metrics import TOOL_CACHE, TOOL_ERRORS, TOOL_IN_FLIGHT, TOOL_LATENCY, track
+from backend.utils.singleflight import AsyncSingleFlight
+from backend.utils.tracing import annotate, span
+from backend.config.default_config import TRAVEL_CACHE_MAX_ITEMS, TRAVEL_CACHE_PATH
 
+# Shared by every tool; keys are prefixed with the tool class name
+tool_cache = TTLCache("travel_tools", max_items=TRAVEL_CACHE_MAX_ITEMS, sqlite_path=TRAVEL_CACHE_PATH)
+
+# Concurrent cache misses (and refreshes) for the same key share one execution
+tool_flight = AsyncSingleFlight("travel_tools")
+
+
+def _normalize(value):
+    return value.strip().lower() if isinstance(value, str) else value
 
 
 class TravelTool(ABC):
     """abstract base class for travel tools"""
+
+    # TravelPlannerState fields the tool reads and writes. The planner uses them to
+    # decide which tools must wait for others; `query` is read-only input and
+    # `messages` is an append-only log, so neither needs to be declared.
+    reads: tuple = ()
+    writes: tuple = ()
+
+    # Tools opt in to response caching by setting cache_ttl (seconds). Results are
+    # keyed by the cache_params query fields plus the values of `reads`, and may be
+    # served for cache_stale_ttl more seconds while a background refresh runs.
+    cache_ttl: float = None
+    cache_stale_ttl: float = 0
+    cache_params: tuple = ()
+
+    _refreshing = set()
+    # Strong references to background refreshes, which the loop itself only holds weakly
+    _refresh_tasks = set()
+
     @abstractmethod
     async def execute(self,state: TravelPlannerState) -> TravelPlannerState:
        pass
 
-  
\ No newline at end of file
+    async def run(self, state: TravelPlannerState) -> TravelPlannerState:
+        """Executes the tool, serving its results from the cache when it opts in."""
+        with span("tool", tool=type(self).__name__):
+            if not self.cache_ttl:
+                return await self._timed_execute(state)
+
+            key = self.cache_key(state)
+            cached, is_stale = tool_cache.get(key)
+            lookup = "miss" if cached is None else "stale" if is_stale else "hit"
+            TOOL_CACHE.labels(type(self).__name__, lookup).inc()
+            annotate(cache=lookup)
+            if cached is None:
+                cached = await tool_flight.do(key, self._execute_and_store, key, state)
+            elif is_stale and key not in TravelTool._refreshing:
+                TravelTool._refreshing.add(key)
+                task = asyncio.create_task(tool_flight.do(key, self._execute_and_store, key, state))
+                TravelTool._refresh_tasks.add(task)
+                task.add_done_callback(lambda done: self._refresh_done(key, done))
+
+            # The memory tier hands out the cached objects themselves; never let a request mutate them
+            cached = copy.deepcopy(cached)
+            for field, value in cached["fields"].items():
+                setattr(state, field, value)
+            state.messages.extend(cached["messages"])
+            return state
+
+    def _refresh_done(self, key, task):
+        TravelTool._refreshing.discard(key)
+        TravelTool._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"ERROR: Background refresh of {key} failed. Error: {task.exception()}")
+
+    async def _timed_execute(self, state: TravelPlannerState) -> TravelPlannerState:
+        with track(TOOL_LATENCY, type(self).__name__, in_flight=TOOL_IN_FLIGHT, errors=TOOL_ERRORS):
+            return await self.execute(state)
+
+    def cache_key(self, state: TravelPlannerState) -> str:
+        params = {name: _normalize(state.query.get(name)) for name in self.cache_params}
+        params.update({field: getattr(state, field) for field in self.reads})
+        return f"{type(self).__name__}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    async def _execute_and_store(self, key, state):
+        """Runs the tool on a scratch copy of the state and caches what it wrote."""
+        scratch = state.model_copy(update={"messages": []}, deep=True)
+        scratch = await self._timed_execute(scratch)
+        result = {
+            "fields": {field: getattr(scratch, field) for field in self.writes},
+            "messages": scratch.messages,
+        }
+        # Tools report failures in their messages rather than raising; never cache those
+        failed = any(
+            message.get("errors") or str(message.get("content", "")).startswith("Error")
+            for message in scratch.messages
+        )
+        if not failed:
+            tool_cache.set(key, result, ttl=self.cache_ttl, stale_ttl=self.cache_stale_ttl)
+        return result
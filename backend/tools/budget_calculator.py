@@ -1,14 +1,19 @@
 from backend.tools.base_tools import TravelTool
 from langchain_community.tools import TavilySearchResults
-from langchain_openai import ChatOpenAI
+from backend.factory.client_registry import get_llm
 import os
 import re
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 class BudgetCalculatorTool(TravelTool):
     """Tool for planning budget for attractive destinations.  """
+    reads = ("flight_onward_prices", "flight_return_prices")
+    writes = ("budget_breakdown", "total_budget")
+    cache_ttl = 6 * 3600
+    cache_stale_ttl = 6 * 3600
+    cache_params = ("destination", "currency", "nights")
+
     async def execute(self, state):
         destination = state.query.get("destination")
         currency =  state.query.get("currency")
@@ -19,7 +24,7 @@ class BudgetCalculatorTool(TravelTool):
         nights = state.query.get("nights", 3)
         budget = {}
         search =TavilySearchResults(api_key=TAVILY_API_KEY)
-        llm = ChatOpenAI(model="gpt-3.5-turbo", api_key=OPENAI_API_KEY)
+        llm = get_llm(model_name="gpt-3.5-turbo", temperature=0.7)
         queries = {
                     "hotel": f"average price per night for a 3-star hotel room (not hostel) in the city center of {destination} in {currency}",
                     "restaurant": f"average total daily cost for three meals (breakfast, lunch, dinner) per person at mid-range restaurants in {destination} in {currency}",
@@ -29,7 +34,8 @@ class BudgetCalculatorTool(TravelTool):
         # 1st let us try in tavily search
         for key, query in queries.items():
             try:
-                result = await search.run(query)
+                # The tool returns a list of {"url", "content"} results
+                result = str(await search.ainvoke(query))
                 # Extract the first $number found in the result
                 match = re.search(r"(\d{1,6}(?:\.\d{1,2})?)\s?(USD|INR|EUR|₹|\$)?", result, re.IGNORECASE)
                 if match:
@@ -43,7 +49,7 @@ class BudgetCalculatorTool(TravelTool):
         missing = [k for k, v in budget.items() if v is None]  
         for k in missing:               
             prompt = f"What is the average {k} price in {destination} in {currency}?"
-            llm_response =  llm.invoke(prompt)
+            llm_response = await llm.ainvoke(prompt)
             llm_result = llm_response.content if hasattr(llm_response, "content") else llm_response
             match = re.search(r"(\d{1,6}(?:\.\d{1,2})?)\s?(USD|INR|EUR|₹|\$)?", llm_result, re.IGNORECASE)
             if match:
@@ -1,13 +1,21 @@
 from backend.tools.base_tools import TravelTool
-from forex_python.converter import CurrencyRates
-import asyncio
+from backend.services.fx_service import fx_rates
 
 class CurrencyConvertorhTool(TravelTool):
     """Tool for Currency Conversion tool for attractive destinations.  """
+    writes = ("exchange_rate", "currency_conversion")
+
     async def execute(self, state):
         currency = state.query.get("currency")
-        currencyConvertor = CurrencyRates()
-        rate = await asyncio.to_thread(currencyConvertor.get_rate, 'USD', currency)
+        try:
+            rate = fx_rates.get_rate('USD', currency)
+        except ValueError as e:
+            state.messages.append({
+                "role": "tool",
+                "tool_name": "CurrencyConvertorhTool",
+                "content": f"Error converting currency: {str(e)}"
+            })
+            return state
         state.exchange_rate = rate
         state.currency_conversion = f"1 USD = {rate} {currency}"
         state.messages.append({
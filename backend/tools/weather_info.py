@@ -1,6 +1,6 @@
 from backend.tools.base_tools import TravelTool
+from backend.utils.http_client import get_async_client
 import os
-import httpx
 from collections import Counter
 from datetime import datetime, timedelta
 
@@ -10,6 +10,11 @@ OPEN_WEATHER_ENDPOINT = os.getenv("OPEN_WEATHER_ENDPOINT")
 
 class WeatherInfoTool(TravelTool):
     """Tool for getting weather infor of destination.  """
+    writes = ("weather",)
+    cache_ttl = 3600
+    cache_stale_ttl = 1800
+    cache_params = ("destination", "start_date", "nights")
+
     async def execute(self, state):
         destination = state.query.get("destination")
         nights = state.query.get("nights", 3)
@@ -22,27 +27,27 @@ class WeatherInfoTool(TravelTool):
               "units":"metric"
         }
         try:
-              async with httpx.AsyncClient() as client:
-                    response = await client.get(OPEN_WEATHER_ENDPOINT,params=params)
-                    response.raise_for_status()
-                    data =  response.json()
-                    summaries=[]
-                    for date in date_list:
-                        forecasts = [entry for entry in data.get("list", []) if entry["dt_txt"].startswith(date)]
-                        if forecasts:
-                          temps = [f["main"]["temp"] for f in forecasts]
-                          descriptions = [f["weather"][0]["description"] for f in forecasts]
-                          avg_temp = sum(temps) / len(temps)
-                          common_desc = Counter(descriptions).most_common(1)[0][0]
-                          summaries.append(f"{date}: {common_desc}, avg temp {avg_temp:.1f}°C")
-                        else:
-                          summaries.append(f"{date}: No weather data available.")
-                    state.weather = "Weather forecast:\n" + "\n".join(summaries)      
-                    state.messages.append({
-                          "role": "tool",
-                          "tool_name": "weatherinfotool",
-                          "content": f"Weather for {destination}: {state.weather}"
-                    })        
+              client = get_async_client()
+              response = await client.get(OPEN_WEATHER_ENDPOINT,params=params)
+              response.raise_for_status()
+              data =  response.json()
+              summaries=[]
+              for date in date_list:
+                  forecasts = [entry for entry in data.get("list", []) if entry["dt_txt"].startswith(date)]
+                  if forecasts:
+                    temps = [f["main"]["temp"] for f in forecasts]
+                    descriptions = [f["weather"][0]["description"] for f in forecasts]
+                    avg_temp = sum(temps) / len(temps)
+                    common_desc = Counter(descriptions).most_common(1)[0][0]
+                    summaries.append(f"{date}: {common_desc}, avg temp {avg_temp:.1f}°C")
+                  else:
+                    summaries.append(f"{date}: No weather data available.")
+              state.weather = "Weather forecast:\n" + "\n".join(summaries)      
+              state.messages.append({
+                    "role": "tool",
+                    "tool_name": "weatherinfotool",
+                    "content": f"Weather for {destination}: {state.weather}"
+              })        
         except Exception as e:
               state.weather = "Error retrieving weather information: " + str(e)
               state.messages.append({
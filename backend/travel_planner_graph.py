@@ -3,6 +3,7 @@ from backend.travel_supervisor import travel_Supervisor
 from langgraph.checkpoint.memory import MemorySaver
 from backend.state_schema.travel_planner_schema import TravelPlannerState
 from backend.main import travel_planner
+from backend.utils.metrics import time_agent_node
 import uuid
 
 
@@ -14,7 +15,7 @@ def build_agent_graph():
     graph = StateGraph(TravelPlannerState)
 
     graph.add_node("supervisor", travel_Supervisor)
-    graph.add_node("tools", travel_planner.plan)
+    graph.add_node("tools", time_agent_node(travel_planner.plan))
 
 
     graph.set_entry_point("supervisor")
@@ -1,10 +1,12 @@
 from backend.main import travel_planner
 from langchain_openai import ChatOpenAI
 import os
+from backend.utils.metrics import time_agent_node
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 llm = ChatOpenAI(model="gpt-4o", api_key=OPENAI_API_KEY)
 
 
+@time_agent_node
 async def travel_Supervisor(state):
     SYSTEM_PROMPT = """
 You are a helpful travel planning assistant. Your job is to help users plan trips by searching for attractions, activities, and destinations, providing weather forecasts, calculating total and daily budgets, and performing currency conversions as needed. Use the available tools to gather accurate information, perform calculations, and answer user questions clearly and concisely. Always explain your reasoning and cite sources when possible.
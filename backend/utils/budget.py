@@ -0,0 +1,62 @@
+import time
+from functools import wraps
+from backend.config.default_config import (
+    AGENT_MAX_ITERATIONS,
+    AGENT_DEADLINE_SECONDS,
+    AGENT_TOKEN_BUDGET,
+)
+
+
+def start_budget(state):
+    """Fills in the run's budget from state.config on the first supervisor pass."""
+    if state.deadline is not None:
+        return
+    config = state.config
+    state.max_iterations = int(config.get("max_iterations", AGENT_MAX_ITERATIONS))
+    state.deadline = time.time() + float(config.get("deadline_seconds", AGENT_DEADLINE_SECONDS))
+    state.token_budget = int(config.get("token_budget", AGENT_TOKEN_BUDGET))
+
+
+def budget_exceeded(state) -> bool:
+    """True once the deadline has passed or the token budget is spent."""
+    if state.budget_exhausted:
+        return True
+    if state.deadline is not None and time.time() >= state.deadline:
+        return True
+    return bool(state.token_budget) and state.tokens_used >= state.token_budget
+
+
+def can_retry(state) -> bool:
+    """True if another supervisor -> validator iteration fits in the budget."""
+    return state.iterations < (state.max_iterations or AGENT_MAX_ITERATIONS) and not budget_exceeded(state)
+
+
+def record_usage(state, message):
+    """Adds the token usage reported on an LLM response message to the run's total."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    state.tokens_used += usage.get("total_tokens", 0)
+
+
+def finish_with_best(state):
+    """Ends the run with the best candidate seen so far and flags that the budget ran out."""
+    state.budget_exhausted = True
+    if state.best_answer is not None:
+        state.final_answer = state.best_answer
+        state.answer_source = state.best_answer_source
+        state.sources = state.best_sources
+    else:
+        state.final_answer = state.candidate_answer
+    print(f"--- BUDGET: stopped after {state.iterations} iteration(s), {state.tokens_used} tokens ---")
+    return state
+
+
+def within_budget(func):
+    """Skips the node once the deadline or token budget is exhausted."""
+    @wraps(func)
+    def wrapper(state):
+        if budget_exceeded(state):
+            state.budget_exhausted = True
+            print(f"--- BUDGET: skipping node '{func.__name__}', budget exhausted ---")
+            return state
+        return func(state)
+    return wrapper
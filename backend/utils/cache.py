@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU cache with per-entry TTLs and an optional SQLite tier.
+
+    An entry is fresh until its TTL runs out and stale for a further stale_ttl
+    seconds. Stale entries are still returned, flagged as stale, so callers can
+    serve them while they refresh the value in the background.
+    """
+
+    def __init__(self, name: str, max_items: int = 1024, sqlite_path: str = None):
+        self.name = name
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if sqlite_path:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, stale_until REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.commit()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Returns (value, is_stale), or (None, False) when the key is missing or fully expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, stale_until FROM cache WHERE namespace = ? AND key = ?",
+                    (self.name, key),
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1], row[2])
+                    self._remember(key, entry)
+
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._delete(key)
+                self.misses += 1
+                return None, False
+
+            self._memory.move_to_end(key)
+            value, expires_at, _ = entry
+            if expires_at > now:
+                self.hits += 1
+                return value, False
+            self.stale_hits += 1
+            return value, True
+
+    def set(self, key: str, value, ttl: float, stale_ttl: float = 0):
+        expires_at = time.time() + ttl
+        entry = (value, expires_at, expires_at + stale_ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, stale_until) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.name, key, json.dumps(value, default=str), entry[1], entry[2]),
+                )
+                self._conn.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key):
+        self._memory.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, key))
+            self._conn.commit()
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "items": len(self._memory),
+        }
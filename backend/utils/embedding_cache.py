@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+from backend.utils.metrics import EMBEDDING_ERRORS, EMBEDDING_LATENCY, EMBEDDING_TEXTS, track
+from backend.utils.tracing import increment, span
+from backend.config.default_config import (
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    EMBEDDING_CACHE_MAX_ITEMS,
+)
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content address of an embedding: the model name plus a hash of the text."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+class EmbeddingCache:
+    """Two-tier embedding store: an in-memory LRU in front of a size-capped SQLite file."""
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+                 max_disk_items=EMBEDDING_CACHE_MAX_ITEMS):
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by all threads, serialized through self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self._disk_items = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_many(self, keys):
+        """Returns {key: vector} for every key found in either tier."""
+        found = {}
+        with self._lock:
+            disk_keys = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_keys.append(key)
+
+            if disk_keys:
+                unique_keys = list(dict.fromkeys(disk_keys))
+                rows = []
+                # Stay well below SQLite's bound-parameter limit
+                for i in range(0, len(unique_keys), 500):
+                    batch = unique_keys[i:i + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall())
+                for key, blob in rows:
+                    vector = array("f", blob).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+                if rows:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows],
+                    )
+                    self._conn.commit()
+                for key in disk_keys:
+                    if key in found:
+                        self.disk_hits += 1
+                    else:
+                        self.misses += 1
+        return found
+
+    def put_many(self, items):
+        """Stores (key, vector) pairs in both tiers, evicting the least recently used on disk."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, list(vector))
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items],
+            )
+            self._disk_items += max(cursor.rowcount, 0)
+            if self._disk_items > self.max_disk_items:
+                # Trim to 90% of the cap so eviction does not run on every insert
+                excess = self._disk_items - int(self.max_disk_items * 0.9)
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+                self._disk_items -= excess
+            self._conn.commit()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_items": self._disk_items,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends texts missing from the cache to the model."""
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+
+    def _split(self, texts):
+        keys = [embedding_key(self.model, text) for text in texts]
+        found = self.cache.get_many(keys)
+        # Deduplicate so repeated chunks inside one batch are embedded once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        EMBEDDING_TEXTS.labels(self.model, "hit").inc(len(texts) - len(missing))
+        EMBEDDING_TEXTS.labels(self.model, "miss").inc(len(missing))
+        increment("embedding_cache_hits", len(texts) - len(missing))
+        return keys, found, missing
+
+    def _track(self):
+        return track(EMBEDDING_LATENCY, self.model, errors=EMBEDDING_ERRORS)
+
+    def _span(self, missing):
+        return span("embed", model=self.model, texts=len(missing))
+
+    def _merge(self, keys, found, missing, vectors):
+        new_items = list(zip(missing.keys(), vectors))
+        self.cache.put_many(new_items)
+        found.update(new_items)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts):
+        keys, found, missing = self._split(texts)
+        vectors = []
+        if missing:
+            with self._track(), self._span(missing):
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+        return self._merge(keys, found, missing, vectors)
+
+    def embed_query(self, text):
+        keys, found, missing = self._split([text])
+        vectors = []
+        if missing:
+            with self._track(), self._span(missing):
+                vectors = [self.embeddings.embed_query(text)]
+        return self._merge(keys, found, missing, vectors)[0]
+
+    async def aembed_documents(self, texts):
+        keys, found, missing = self._split(texts)
+        vectors = []
+        if missing:
+            with self._track(), self._span(missing):
+                vectors = await self.embeddings.aembed_documents(list(missing.values()))
+        return self._merge(keys, found, missing, vectors)
+
+    async def aembed_query(self, text):
+        keys, found, missing = self._split([text])
+        vectors = []
+        if missing:
+            with self._track(), self._span(missing):
+                vectors = [await self.embeddings.aembed_query(text)]
+        return self._merge(keys, found, missing, vectors)[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Returns the process-wide embedding cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
@@ -6,7 +6,7 @@ class SearchType(Enum):
     APPROXIMATE = "approximate"  # Approximate nearest neighbor search
     MMR = "mmr"                  # Maximal Marginal Relevance reranking
     BM25 = "bm25"                # BM25 keyword-based search (for in-memory, not MongoDB Atlas)
-    # Add more as needed, e.g., HYBRID = "hybrid"
+    HYBRID = "hybrid"            # BM25 + vector search merged with reciprocal-rank fusion
 
 class IndexMechanism(Enum):
     FLAT = "FLAT"
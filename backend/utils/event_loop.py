@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from backend.utils.tracing import traced_context
+
+_loop = None
+_lock = threading.Lock()
+
+
+def use_loop(loop: asyncio.AbstractEventLoop):
+    """Makes an already running loop the shared one, e.g. the ASGI server's loop on startup."""
+    global _loop
+    with _lock:
+        _loop = loop
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide event loop, starting it on a daemon thread on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        with _lock:
+            if _loop is None or _loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="event-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_async(coro, timeout: float = None):
+    """Runs a coroutine on the shared loop and blocks the calling thread until it finishes.
+
+    This replaces asyncio.run() and thread-per-request in the sync Flask
+    handlers, so async clients (HTTP pools, Motor, gRPC channels) are created
+    once and reused by every request.
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async() was called from the shared event loop; await the coroutine instead")
+    # Keep the caller's context (e.g. its trace span) inside the coroutine
+    return asyncio.run_coroutine_threadsafe(traced_context(coro), loop).result(timeout)
+
+
+def call_on_loop(fn, *args):
+    """Calls a sync function on the shared loop's thread and returns its result.
+
+    For clients that bind their async half to the loop current at construction
+    (langchain-milvus creates its AsyncMilvusClient there), so they are usable
+    from coroutines on the shared loop whichever thread first asked for them.
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return fn(*args)
+
+    async def call():
+        return fn(*args)
+
+    return asyncio.run_coroutine_threadsafe(call(), loop).result()
+
+
+def submit(coro):
+    """Schedules a background coroutine on the shared loop and returns its concurrent future."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+    def report(done):
+        if not done.cancelled() and done.exception() is not None:
+            print(f"ERROR: Background task failed. Error: {done.exception()}")
+
+    future.add_done_callback(report)
+    return future
+
+
+def iterate_async(async_iterator, timeout: float = None):
+    """Consumes an async iterator on the shared loop from a sync caller, e.g. a streaming Flask response."""
+    iterator = async_iterator.__aiter__()
+    try:
+        while True:
+            try:
+                yield run_async(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            run_async(aclose())
@@ -0,0 +1,16 @@
+import hashlib
+import json
+
+
+def document_key(doc) -> str:
+    """Stable identity of a chunk, used to deduplicate results from different searches.
+
+    A hash of the text, so hits from any store agree, including collections
+    ingested before chunks carried a chunk_id.
+    """
+    return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+def format_sse(event: str, data) -> str:
+    """Formats one server-sent event; data is sent as JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
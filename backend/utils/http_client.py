@@ -0,0 +1,82 @@
+import asyncio
+import weakref
+import httpx
+from backend.utils.metrics import OUTBOUND_IN_FLIGHT, OUTBOUND_LATENCY, OUTBOUND_REQUESTS, track
+from backend.utils.tracing import span
+from backend.config.default_config import HTTP_POOL_SIZE, HTTP_TIMEOUT
+
+_clients = weakref.WeakKeyDictionary()
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Wraps a transport to record latency and status of every request per host, and trace it."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request):
+        host = request.url.host
+        status = "error"
+        try:
+            with track(OUTBOUND_LATENCY, host, in_flight=OUTBOUND_IN_FLIGHT), \
+                    span("http", service=host, method=request.method) as request_span:
+                response = self._transport.handle_request(request)
+                if request_span is not None:
+                    request_span.set(status=response.status_code)
+            status = str(response.status_code)
+            return response
+        finally:
+            OUTBOUND_REQUESTS.labels(host, status).inc()
+
+    def close(self):
+        self._transport.close()
+
+
+class MeteredAsyncTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of MeteredTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        host = request.url.host
+        status = "error"
+        try:
+            with track(OUTBOUND_LATENCY, host, in_flight=OUTBOUND_IN_FLIGHT), \
+                    span("http", service=host, method=request.method) as request_span:
+                response = await self._transport.handle_async_request(request)
+                if request_span is not None:
+                    request_span.set(status=response.status_code)
+            status = str(response.status_code)
+            return response
+        finally:
+            OUTBOUND_REQUESTS.labels(host, status).inc()
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Returns the keep-alive HTTP/2 client shared by the travel tools.
+
+    httpx connections belong to the event loop that opened them, so one client
+    is kept per running loop. When the app runs on a single long-lived loop this
+    is one connection pool for the whole process.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+        client = httpx.AsyncClient(
+            transport=MeteredAsyncTransport(httpx.AsyncHTTPTransport(http2=True, limits=limits)),
+            timeout=HTTP_TIMEOUT,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Closes the client of the running loop, e.g. on application shutdown."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
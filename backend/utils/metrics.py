@@ -1,18 +1,281 @@
+import asyncio
+import threading
 import time
+from bisect import bisect_left
 from functools import wraps
+from backend.utils.tracing import node_span, span
+
+# Latency buckets in seconds, from cache hits up to slow LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated only when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Metric:
+    """A metric family; labels(*values) returns the child for one label combination."""
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, values, [("le", le)]), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, values), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, values), count
+
+
+class MetricsRegistry:
+    """Process-wide set of metric families, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+NODE_LATENCY = metrics_registry.histogram("agent_node_duration_seconds", "Latency of graph nodes.", ("node",))
+NODE_IN_FLIGHT = metrics_registry.gauge("agent_node_in_flight", "Graph nodes currently running.", ("node",))
+NODE_ERRORS = metrics_registry.counter("agent_node_errors_total", "Graph nodes that raised.", ("node",))
+
+TOOL_LATENCY = metrics_registry.histogram("travel_tool_duration_seconds", "Latency of travel tool executions.", ("tool",))
+TOOL_IN_FLIGHT = metrics_registry.gauge("travel_tool_in_flight", "Travel tools currently executing.", ("tool",))
+TOOL_ERRORS = metrics_registry.counter("travel_tool_errors_total", "Travel tool executions that raised.", ("tool",))
+TOOL_CACHE = metrics_registry.counter(
+    "travel_tool_cache_total", "Travel tool cache lookups by result (hit, stale, miss).", ("tool", "result")
+)
+
+RETRIEVER_LATENCY = metrics_registry.histogram(
+    "retriever_duration_seconds", "Latency of document retrieval calls.", ("retriever",)
+)
+RETRIEVER_ERRORS = metrics_registry.counter("retriever_errors_total", "Retrieval calls that raised.", ("retriever",))
+
+EMBEDDING_LATENCY = metrics_registry.histogram(
+    "embedding_batch_duration_seconds", "Latency of embedding model calls (cache misses only).", ("model",)
+)
+EMBEDDING_ERRORS = metrics_registry.counter("embedding_errors_total", "Embedding model calls that raised.", ("model",))
+EMBEDDING_TEXTS = metrics_registry.counter(
+    "embedding_texts_total", "Texts looked up in the embedding cache by result (hit, miss).", ("model", "result")
+)
+
+OUTBOUND_LATENCY = metrics_registry.histogram(
+    "outbound_request_duration_seconds", "Latency of outbound API calls until the response headers.", ("service",)
+)
+OUTBOUND_IN_FLIGHT = metrics_registry.gauge("outbound_requests_in_flight", "Outbound API calls in progress.", ("service",))
+OUTBOUND_REQUESTS = metrics_registry.counter(
+    "outbound_requests_total", "Outbound API calls by response status, or error.", ("service", "status")
+)
+
+SINGLEFLIGHT_CALLS = metrics_registry.counter(
+    "singleflight_calls_total",
+    "Calls through a single-flight group by role: leader (executed) or waiter (coalesced into a leader's call).",
+    ("group", "role"),
+)
+
+
+class track:
+    """Context manager that observes the block's duration on histogram and, if given, keeps
+    in_flight up to date and counts exceptions on errors. All three share the same labels.
+    """
+
+    __slots__ = ("histogram", "in_flight", "errors", "start")
+
+    def __init__(self, histogram, *labels, in_flight=None, errors=None):
+        self.histogram = histogram.labels(*labels)
+        self.in_flight = in_flight.labels(*labels) if in_flight is not None else None
+        self.errors = errors.labels(*labels) if errors is not None else None
+
+    def __enter__(self):
+        if self.in_flight is not None:
+            self.in_flight.inc()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        if self.in_flight is not None:
+            self.in_flight.dec()
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc()
+        return False
+
+
+class track_outbound(track):
+    """track() for an API call made through a vendor SDK; counts it as ok or error in outbound_requests_total."""
+
+    __slots__ = ("service", "span")
+
+    def __init__(self, service: str):
+        super().__init__(OUTBOUND_LATENCY, service, in_flight=OUTBOUND_IN_FLIGHT)
+        self.service = service
+        self.span = span("http", service=service)
+
+    def __enter__(self):
+        self.span.__enter__()
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        OUTBOUND_REQUESTS.labels(self.service, "error" if exc_type is not None else "ok").inc()
+        super().__exit__(exc_type, exc, tb)
+        return self.span.__exit__(exc_type, exc, tb)
+
 
-# A simple decorator for timing functions
 def time_agent_node(func):
+    """Records latency, in-flight count and errors of a graph node, sync or async, under its
+    function name, and traces it as a node span of the current request.
+    """
+    node = func.__name__
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with track(NODE_LATENCY, node, in_flight=NODE_IN_FLIGHT, errors=NODE_ERRORS), \
+                    node_span(node, args[0] if args else None):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
     @wraps(func)
-    def wrapper(state):
-        start_time = time.time()
-        # Run the original agent function
-        result_state = func(state)
-        end_time = time.time()
-        
-        duration = end_time - start_time
-        print(f"--- METRIC: Node '{func.__name__}' took {duration:.2f} seconds. ---")
-
-        
-        return result_state
-    return wrapper
\ No newline at end of file
+    def wrapper(*args, **kwargs):
+        with track(NODE_LATENCY, node, in_flight=NODE_IN_FLIGHT, errors=NODE_ERRORS), \
+                node_span(node, args[0] if args else None):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,22 @@
+import asyncio
+import os
+import weakref
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend.config.default_config import MONGO_POOL_SIZE
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Returns the pooled Motor client of the running event loop.
+
+    Motor clients are bound to the loop they are first used on, so like the
+    async HTTP client one is kept per loop; on the shared loop that is one
+    connection pool per process.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncIOMotorClient(os.environ.get("MONGO_DB_URI"), maxPoolSize=MONGO_POOL_SIZE)
+        _clients[loop] = client
+    return client
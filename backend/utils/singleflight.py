@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import weakref
+from backend.utils.metrics import SINGLEFLIGHT_CALLS
+from backend.utils.tracing import annotate
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query, for use in single-flight keys."""
+    return " ".join(str(text).lower().split())
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls from threads (the Flask request paths).
+
+    The first caller for a key runs the function; callers arriving with the same
+    key while it runs wait and get the same result, or the same exception. The
+    key is forgotten as soon as the call finishes, so nothing is cached.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            SINGLEFLIGHT_CALLS.labels(self.name, "waiter").inc()
+            annotate(coalesced=True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_CALLS.labels(self.name, "leader").inc()
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines; calls are coalesced per event loop.
+
+    Waiters are shielded, so a cancelled waiter does not cancel the shared call;
+    if the leader itself is cancelled, its waiters see the cancellation too.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            SINGLEFLIGHT_CALLS.labels(self.name, "waiter").inc()
+            annotate(coalesced=True)
+            return await asyncio.shield(future)
+
+        SINGLEFLIGHT_CALLS.labels(self.name, "leader").inc()
+        future = calls[key] = loop.create_future()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody was waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del calls[key]
@@ -0,0 +1,343 @@
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from langchain_core.callbacks import BaseCallbackHandler
+from backend.config.default_config import (
+    TRACING_ENABLED,
+    TRACE_PATH,
+    TRACE_SERVICE_NAME,
+    TRACE_MAX_BYTES,
+    TRACE_BACKUPS,
+    TRACE_INDEX_SIZE,
+)
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+def _attribute_value(value):
+    # OTLP/JSON AnyValue encoding
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation of a trace. Spans are written to the sink when they end."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns",
+                 "error", "root", "_iterations", "_lock")
+
+    def __init__(self, name: str, parent=None, attributes=None):
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.root = parent.root if parent is not None else self
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self._iterations = {}
+        self._lock = threading.Lock()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def increment(self, key: str, amount=1):
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def iteration(self, number: int):
+        """The root's span for one supervisor -> validator pass; it ends with its last node."""
+        with self._lock:
+            span = self._iterations.get(number)
+            if span is None:
+                span = Span("graph.iteration", parent=self, attributes={"iteration": number})
+                self._iterations[number] = span
+        return span
+
+    def end(self, error: BaseException = None):
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        for span in self._iterations.values():
+            sink.write(span)
+        sink.write(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class span:
+    """Context manager that opens a child of the current span, for sync and async code alike.
+
+    Outside a traced request it does nothing (and yields None) unless root=True,
+    which starts a new trace. asyncio tasks and to_thread calls inherit the
+    current span, so concurrent children are attributed to the right parent.
+    """
+
+    __slots__ = ("name", "attributes", "root", "_span", "_token")
+
+    def __init__(self, name: str, root: bool = False, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.root = root
+
+    def __enter__(self):
+        parent = _current.get()
+        if not TRACING_ENABLED or (parent is None and not self.root):
+            self._span = None
+            return None
+        self._span = Span(self.name, parent=None if self.root else parent, attributes=self.attributes)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is not None:
+            _current.reset(self._token)
+            self._span.end(exc)
+        return False
+
+
+def current_span():
+    return _current.get()
+
+
+def current_trace_id():
+    span = _current.get()
+    return span.trace_id if span is not None else None
+
+
+def annotate(**attributes):
+    """Sets attributes on the current span, if any."""
+    span = _current.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def increment(key: str, amount=1):
+    """Adds to a counter attribute of the current span, e.g. cache hits, if there is one."""
+    span = _current.get()
+    if span is not None and amount:
+        span.increment(key, amount)
+
+
+class node_span(span):
+    """span() for a graph node. Nodes of an agent run are grouped under one span per
+    supervisor iteration, which is only known once the supervisor has run, so the
+    parent is assigned when the node ends.
+    """
+
+    __slots__ = ("state", "tokens_before")
+
+    def __init__(self, node: str, state=None):
+        super().__init__(f"node.{node}", node=node)
+        self.state = state
+        self.tokens_before = getattr(state, "tokens_used", None)
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        iteration = getattr(self.state, "iterations", None)
+        if span is not None and iteration:
+            parent = span.root.iteration(iteration)
+            parent.start_ns = min(parent.start_ns, span.start_ns)
+            parent.end_ns = max(parent.end_ns or 0, time.time_ns())
+            span.parent_id = parent.span_id
+            if self.tokens_before is not None:
+                span.set(tokens=self.state.tokens_used - self.tokens_before)
+        return super().__exit__(exc_type, exc, tb)
+
+
+class TraceSink:
+    """Appends finished spans to a JSONL file from a background thread.
+
+    Each line is an OTLP/JSON ExportTraceServiceRequest (resourceSpans), the
+    format of the OpenTelemetry Collector file exporter, so the file can be
+    replayed into any OTLP backend. The file is rotated once it exceeds
+    max_bytes (path.1 ... path.<backups>), and the spans of the last
+    index_size traces are also kept in memory for find().
+    """
+
+    def __init__(self, path=TRACE_PATH, service_name=TRACE_SERVICE_NAME, flush_seconds=0.5, max_batch=512,
+                 max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS, index_size=TRACE_INDEX_SIZE):
+        self.path = path
+        self.service_name = service_name
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.index_size = index_size
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()
+
+    def write(self, span: Span):
+        if self._thread is None:
+            self._start()
+        self._queue.put(span)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="trace-sink", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._append(batch)
+            except Exception as e:
+                print(f"ERROR: Could not write {len(batch)} trace spans. Error: {e}")
+
+    def _append(self, batch):
+        spans = [span.to_otlp() for span in batch]
+        self._remember(spans)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._rotate()
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "backend"}, "spans": spans}],
+        }]}
+        with open(self.path, "a") as f:
+            f.write(json.dumps(request, default=str) + "\n")
+
+    def _remember(self, spans):
+        with self._lock:
+            for span in spans:
+                trace = self._recent.get(span["traceId"])
+                if trace is None:
+                    trace = self._recent[span["traceId"]] = []
+                    while len(self._recent) > self.index_size:
+                        self._recent.popitem(last=False)
+                trace.append(span)
+
+    def _rotate(self):
+        if self.max_bytes <= 0 or not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def find(self, trace_id: str):
+        """All written spans of one trace, oldest first, as OTLP/JSON span dicts.
+
+        Recent traces are answered from memory; older ones are looked up in the
+        current and rotated files, which rotation keeps bounded in size.
+        """
+        with self._lock:
+            spans = list(self._recent.get(trace_id, ()))
+        if not spans:
+            paths = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+            for path in paths:
+                if os.path.exists(path):
+                    spans.extend(self._scan(path, trace_id))
+        return sorted(spans, key=lambda s: int(s["startTimeUnixNano"]))
+
+    @staticmethod
+    def _scan(path, trace_id):
+        spans = []
+        with open(path) as f:
+            for line in f:
+                if trace_id not in line:
+                    continue
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        spans.extend(s for s in scope["spans"] if s["traceId"] == trace_id)
+        return spans
+
+
+sink = TraceSink()
+
+
+def traced_context(coro):
+    """Wraps a coroutine so it runs with the caller's context variables (and so its current span)
+    when it is scheduled on another thread's loop, e.g. by run_async.
+    """
+    values = list(contextvars.copy_context().items())
+
+    async def runner():
+        for var, value in values:
+            var.set(value)
+        return await coro
+
+    return runner()
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records every chat model call made inside a trace as an "llm" span with its token usage."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._spans = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        parent = _current.get()
+        if parent is None or not TRACING_ENABLED:
+            return
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or params.get("_type", "unknown")
+        self._spans[run_id] = Span("llm", parent=parent, attributes={"model": model})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        span.set(
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            total_tokens=usage.get("total_tokens", 0),
+        )
+        span.end()
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            span.end(error)
+
+
+tracing_callbacks = TracingCallbackHandler()